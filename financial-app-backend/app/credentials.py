@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a fetched secret is reused before Secrets Manager is asked again
+DB_SECRET_REFRESH_SECONDS = float(os.getenv("DB_SECRET_REFRESH_SECONDS", "300"))
+
+# MySQL "Access denied for user" error code
+MYSQL_ACCESS_DENIED = 1045
+
+class LocalSecretsManager:
+    """
+    Local stand-in for the AWS Secrets Manager client
+
+    Implements the get_secret_value/put_secret_value calls the credential
+    provider uses, backed by a dict (or the JSON file in LOCAL_SECRETS_FILE),
+    so tests and offline runs need neither boto3 nor AWS access.
+    """
+
+    def __init__(self, secrets: Optional[dict] = None):
+        self.secrets = {name: self._encode(value) for name, value in (secrets or {}).items()}
+        self.get_calls = 0
+
+    @staticmethod
+    def _encode(value) -> str:
+        return value if isinstance(value, str) else json.dumps(value)
+
+    @classmethod
+    def from_env(cls) -> "LocalSecretsManager":
+        """Load secrets from the JSON object in LOCAL_SECRETS_FILE ({secret_id: secret})"""
+        path = os.getenv("LOCAL_SECRETS_FILE")
+        if not path:
+            return cls()
+        with open(path) as secrets_file:
+            return cls(json.load(secrets_file))
+
+    def get_secret_value(self, SecretId: str) -> dict:
+        self.get_calls += 1
+        if SecretId not in self.secrets:
+            raise KeyError(f"Secrets Manager can't find the specified secret: {SecretId}")
+        return {"Name": SecretId, "SecretString": self.secrets[SecretId]}
+
+    def put_secret_value(self, SecretId: str, SecretString: str) -> dict:
+        """Store a new secret version (simulates a rotation)"""
+        self.secrets[SecretId] = self._encode(SecretString)
+        return {"Name": SecretId}
+
+def create_secrets_manager_client(region_name: str):
+    """Secrets Manager client; boto3 is only imported when AWS is actually used"""
+    if os.getenv("SECRETS_MANAGER_BACKEND", "aws").lower() == "local":
+        return LocalSecretsManager.from_env()
+
+    import boto3
+
+    session = boto3.session.Session()
+    return session.client(service_name='secretsmanager', region_name=region_name)
+
+def credentials_from_environment() -> dict:
+    """Fallback credentials for local development"""
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", 3306)),
+        "username": os.getenv("DB_USER", "admin"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "dbname": os.getenv("DB_NAME", "financial_app")
+    }
+
+class DatabaseCredentialProvider:
+    """
+    Fetches database credentials once and caches them for a refresh interval
+
+    Rotation is handled by refresh(): the engine calls it when MySQL rejects
+    the cached password, and new connections then use the rotated secret.
+    """
+
+    def __init__(
+        self,
+        secret_name: Optional[str] = None,
+        region_name: Optional[str] = None,
+        refresh_interval: float = DB_SECRET_REFRESH_SECONDS,
+        client_factory: Optional[Callable] = None
+    ):
+        environment = os.getenv("ENVIRONMENT", "dev")
+        self.secret_name = secret_name or os.getenv("SECRET_NAME") or f"financial-app-{environment}/database"
+        self.region_name = region_name or os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+        self.refresh_interval = refresh_interval
+        self._client_factory = client_factory or create_secrets_manager_client
+        self._client = None
+        self._credentials: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        """Cached credentials, refetched once the refresh interval has passed"""
+        credentials = self._credentials
+        if credentials is not None and time.monotonic() - self._fetched_at < self.refresh_interval:
+            return credentials
+
+        with self._lock:
+            if self._credentials is None or time.monotonic() - self._fetched_at >= self.refresh_interval:
+                self._store(self._fetch())
+            return self._credentials
+
+    def refresh(self) -> bool:
+        """Refetch now; True if the credentials changed (e.g. after a rotation)"""
+        with self._lock:
+            previous = self._credentials
+            fetched = self._fetch()
+            self._store(fetched)
+            return fetched is not None and self._credentials != previous
+
+    def _store(self, fetched: Optional[dict]):
+        """
+        Cache a fetch result; a failed fetch (None) keeps the last known good credentials
+
+        The environment fallback is only used while nothing has been fetched
+        yet, so a transient Secrets Manager error never replaces a valid secret
+        with the local development defaults.
+        """
+        if fetched is not None:
+            self._credentials = fetched
+        elif self._credentials is None:
+            self._credentials = credentials_from_environment()
+        self._fetched_at = time.monotonic()
+
+    def invalidate(self):
+        """Force the next get() to refetch"""
+        self._fetched_at = 0.0
+
+    def reset_client(self):
+        """Drop the Secrets Manager client (clients are not safe to share across fork)"""
+        self._client = None
+
+    def _fetch(self) -> Optional[dict]:
+        """The current secret, or None if Secrets Manager could not be read"""
+        try:
+            if self._client is None:
+                self._client = self._client_factory(self.region_name)
+
+            response = self._client.get_secret_value(SecretId=self.secret_name)
+            secret = json.loads(response['SecretString'])
+            logger.info(f"Loaded database credentials from secret '{self.secret_name}'")
+            return secret
+
+        except Exception as e:
+            logger.error(f"Error retrieving database credentials: {str(e)}")
+            return None
+
+def is_access_denied(error: Exception) -> bool:
+    """True for MySQL authentication failures (pymysql and aiomysql)"""
+    args = getattr(error, "args", ())
+    return bool(args) and args[0] == MYSQL_ACCESS_DENIED
+
+credential_provider = DatabaseCredentialProvider()
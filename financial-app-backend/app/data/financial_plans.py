@@ -1,4 +1,5 @@
-from app.models.schemas import FinancialPlan
+from typing import Optional
+from app.models.schemas import FinancialPlan, PLAN_SORT_KEYS
 
 # Mock data for financial plans
 FINANCIAL_PLANS = [
@@ -68,9 +69,32 @@ def get_all_plans():
     """Return all available financial plans"""
     return FINANCIAL_PLANS
 
+_PLANS_BY_ID = {plan.id: plan for plan in FINANCIAL_PLANS}
+
 def get_plan_by_id(plan_id: int):
     """Get a specific plan by ID"""
-    for plan in FINANCIAL_PLANS:
-        if plan.id == plan_id:
-            return plan
-    return None
+    return _PLANS_BY_ID.get(plan_id)
+
+def search_plans(
+    contribution: Optional[float] = None,
+    min_term_months: Optional[int] = None,
+    max_term_months: Optional[int] = None,
+    min_rate_bps: Optional[int] = None,
+    sort: str = "id"
+):
+    """Static counterpart of DatabaseService.search_financial_plans (same filters and order, unpaged)"""
+    plans = [
+        plan for plan in FINANCIAL_PLANS
+        if (contribution is None or plan.min_contribution <= contribution <= plan.max_contribution)
+        and (min_term_months is None or (plan.term_months is not None and plan.term_months >= min_term_months))
+        and (max_term_months is None or (plan.term_months is not None and plan.term_months <= max_term_months))
+        and (min_rate_bps is None or (plan.interest_rate_bps is not None and plan.interest_rate_bps >= min_rate_bps))
+    ]
+    descending = sort.startswith("-")
+    attribute = PLAN_SORT_KEYS[sort[1:] if descending else sort]
+    # Two stable passes: id ascending breaks ties, as in the SQL ORDER BY; unparsed values go last
+    plans.sort(key=lambda plan: plan.id)
+    unparsed = [plan for plan in plans if getattr(plan, attribute) is None]
+    plans = [plan for plan in plans if getattr(plan, attribute) is not None]
+    plans.sort(key=lambda plan: getattr(plan, attribute), reverse=descending)
+    return plans + unparsed
@@ -1,9 +1,18 @@
-import json
-import boto3
-from sqlalchemy import create_engine, MetaData, text
+import itertools
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from sqlalchemy import create_engine, MetaData, text, event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.credentials import credential_provider, is_access_denied
+from app.metrics import DB_READ_SESSIONS, install_pool_metrics, timed_pool_class
+from app.profiling import install_sql_profiling
+from app.services.circuit_breaker import OPEN, CircuitBreaker
 import logging
 
 # Configure logging
@@ -16,38 +25,104 @@ Base = declarative_base()
 # Global variables
 engine = None
 SessionLocal = None
+async_engine = None
+AsyncSessionLocal = None
+
+# Comma-separated read replica URLs, e.g. sqlite:///./replica1.db,sqlite:///./replica2.db
+# (MySQL replica URLs without a user name connect with the primary's credentials)
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+# How read sessions pick a replica: round_robin or least_loaded (fewest sessions in flight)
+DB_REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+# How long a replica is skipped after a connection failure (its circuit's reset timeout)
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+# Drivers used for each backend in sync and async mode
+SYNC_DRIVERS = {"mysql": "mysql+pymysql", "sqlite": "sqlite"}
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+# Pools that time every checkout (db_pool_checkout_wait_seconds)
+TimedQueuePool = timed_pool_class(QueuePool, "sync")
+TimedAsyncQueuePool = timed_pool_class(AsyncAdaptedQueuePool, "async")
 
 def get_database_credentials():
-    """Retrieve database credentials from AWS Secrets Manager"""
+    """Database credentials from AWS Secrets Manager (cached, see app.credentials)"""
+    return credential_provider.get()
+
+def _connect_with_current_credentials(dialect, conn_rec, cargs, cparams):
+    """
+    Open DBAPI connections with the provider's current credentials
+
+    If MySQL rejects them (the secret was rotated), refetch the secret once
+    and retry, so the pool recovers without restarting the process.
+    """
+    credentials = credential_provider.get()
+    cparams["user"] = credentials["username"]
+    cparams["password"] = credentials["password"]
+    
     try:
-        # Create a Secrets Manager client
-        session = boto3.session.Session()
-        client = session.client(
-            service_name='secretsmanager',
-            region_name='us-east-1'
-        )
-        
-        # Retrieve the secret - use environment-aware secret name
-        import os
-        environment = os.getenv("ENVIRONMENT", "dev")
-        secret_name = f"financial-app-{environment}/database"
-        response = client.get_secret_value(SecretId=secret_name)
+        return dialect.connect(*cargs, **cparams)
+    except Exception as e:
+        if not is_access_denied(e) or not credential_provider.refresh():
+            raise
         
-        # Parse the secret
-        secret = json.loads(response['SecretString'])
-        return secret
+        logger.warning("Database rejected cached credentials; reconnecting with refreshed secret")
+        credentials = credential_provider.get()
+        cparams["user"] = credentials["username"]
+        cparams["password"] = credentials["password"]
+        return dialect.connect(*cargs, **cparams)
+
+def install_credential_refresh(sync_engine):
+    """Route new connections of an engine built from Secrets Manager credentials through the provider"""
+    if not os.getenv("DATABASE_URL"):
+        event.listen(sync_engine, "do_connect", _connect_with_current_credentials)
+
+def with_driver(url, drivers: dict) -> URL:
+    """`url` with the sync or async driver of its backend"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in drivers:
+        raise ValueError(f"Unsupported database backend: {backend}")
+    return url.set(drivername=drivers[backend])
+
+def get_database_url(async_driver: bool = False) -> URL:
+    """
+    Build the database URL for the sync or async driver
+
+    DATABASE_URL (e.g. sqlite:///./financial_app.db for local runs) takes
+    precedence over the Secrets Manager / environment credentials.
+    """
+    drivers = ASYNC_DRIVERS if async_driver else SYNC_DRIVERS
+    database_url = os.getenv("DATABASE_URL")
     
-    except Exception as e:
-        logger.error(f"Error retrieving database credentials: {str(e)}")
-        # Fallback to environment variables for local development
-        import os
-        return {
-            "host": os.getenv("DB_HOST", "localhost"),
-            "port": int(os.getenv("DB_PORT", 3306)),
-            "username": os.getenv("DB_USER", "admin"),  # Changed from DB_USERNAME to DB_USER
-            "password": os.getenv("DB_PASSWORD", ""),
-            "dbname": os.getenv("DB_NAME", "financial_app")
-        }
+    if database_url:
+        return with_driver(database_url, drivers)
+    
+    db_config = get_database_credentials()
+    return URL.create(
+        drivers["mysql"],
+        username=db_config['username'],
+        password=db_config['password'],
+        host=db_config['host'],
+        port=db_config['port'],
+        database=db_config['dbname'],
+        query={"charset": "utf8mb4"}
+    )
+
+def get_engine_options(url: URL) -> dict:
+    """Pooling options for the given database URL"""
+    if url.get_backend_name() == "sqlite":
+        if url.get_driver_name() == "aiosqlite":
+            return {}
+        return {"connect_args": {"check_same_thread": False}}
+
+    # serve.py sets these per worker by dividing DB_CONNECTION_BUDGET across processes
+    return {
+        "poolclass": TimedAsyncQueuePool if url.get_driver_name() == "aiomysql" else TimedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_pre_ping": True,
+        "pool_recycle": 3600
+    }
 
 def create_database_if_not_exists():
     """Create the database if it doesn't exist"""
@@ -82,28 +157,21 @@ def create_database_engine():
     global engine
     
     try:
-        # First, ensure database exists
-        create_database_if_not_exists()
+        # First, ensure database exists (an explicit DATABASE_URL is assumed to be provisioned)
+        if not os.getenv("DATABASE_URL"):
+            create_database_if_not_exists()
         
-        # Get database credentials
-        db_config = get_database_credentials()
-        
-        # Create connection string
-        connection_string = (
-            f"mysql+pymysql://{db_config['username']}:{db_config['password']}"
-            f"@{db_config['host']}:{db_config['port']}/{db_config['dbname']}"
-            f"?charset=utf8mb4"
-        )
+        url = get_database_url()
         
         # Create engine with connection pooling
         engine = create_engine(
-            connection_string,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-            echo=False  # Set to True for SQL debugging
+            url,
+            echo=False,  # Set to True for SQL debugging
+            **get_engine_options(url)
         )
+        install_credential_refresh(engine)
+        install_pool_metrics(engine, "sync")
+        install_sql_profiling(engine, "sync")
         
         logger.info("Database engine created successfully")
         return engine
@@ -133,6 +201,257 @@ def get_database_session():
     finally:
         db.close()
 
+def create_async_database_engine():
+    """Create the asyncio engine (aiomysql, or aiosqlite for local runs)"""
+    global async_engine
+    
+    try:
+        url = get_database_url(async_driver=True)
+        async_engine = create_async_engine(
+            url,
+            echo=False,
+            **get_engine_options(url)
+        )
+        install_credential_refresh(async_engine.sync_engine)
+        install_pool_metrics(async_engine.sync_engine, "async")
+        install_sql_profiling(async_engine.sync_engine, "async")
+        
+        logger.info("Async database engine created successfully")
+        return async_engine
+        
+    except Exception as e:
+        logger.error(f"Error creating async database engine: {str(e)}")
+        raise
+
+def create_async_session_factory():
+    """Create async session factory"""
+    global AsyncSessionLocal, async_engine
+    
+    if async_engine is None:
+        async_engine = create_async_database_engine()
+    
+    # Objects stay usable after commit without an implicit (blocking) reload
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    logger.info("Async database session factory created successfully")
+
+async def get_async_database_session():
+    """Get async database session for route handlers"""
+    if AsyncSessionLocal is None:
+        create_async_session_factory()
+    
+    async with AsyncSessionLocal() as db:
+        yield db
+
+class Replica:
+    """
+    One read replica: its async engine (built on first use), load counters and circuit
+
+    The replica has its own circuit breaker, opened by a single connectivity
+    failure, so a broken replica leaves rotation without ever counting
+    against the primary's circuit.
+    """
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = with_driver(url, ASYNC_DRIVERS)
+        self.engine = None
+        self.session_factory = None
+        self.in_flight = 0
+        self.sessions_total = 0
+        self.circuit_breaker = CircuitBreaker(
+            name,
+            failure_threshold=1,
+            reset_timeout_seconds=DB_REPLICA_RETRY_SECONDS,
+            half_open_max_calls=1
+        )
+        # Checkout waits are reported under the replica's own label
+        self.pool_class = timed_pool_class(AsyncAdaptedQueuePool, name)
+
+    def available(self) -> bool:
+        return self.circuit_breaker.state != OPEN
+
+    def get_session_factory(self):
+        if self.session_factory is None:
+            options = get_engine_options(self.url)
+            if "poolclass" in options:
+                options["poolclass"] = self.pool_class
+            self.engine = create_async_engine(self.url, echo=False, **options)
+            sync_engine = self.engine.sync_engine
+            if self.url.get_backend_name() == "mysql" and self.url.username is None:
+                event.listen(sync_engine, "do_connect", _connect_with_current_credentials)
+            install_pool_metrics(sync_engine, self.name)
+            install_sql_profiling(sync_engine, self.name)
+            self.session_factory = async_sessionmaker(
+                bind=self.engine,
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False
+            )
+            logger.info(f"Read replica engine {self.name} created ({self.url.render_as_string(hide_password=True)})")
+        return self.session_factory
+
+    def forget_engine(self):
+        if self.engine is not None:
+            self.engine.sync_engine.dispose(close=False)
+        self.engine = None
+        self.session_factory = None
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+        self.engine = None
+        self.session_factory = None
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "url": self.url.render_as_string(hide_password=True),
+            "available": self.available(),
+            "circuit": self.circuit_breaker.state,
+            "in_flight": self.in_flight,
+            "sessions_total": self.sessions_total,
+            "failures_total": self.circuit_breaker.failures_total
+        }
+
+class ReplicaSet:
+    """
+    Routes read-only sessions to the read replicas
+
+    Replicas are picked round-robin or by the fewest sessions in flight
+    (ties rotate). A replica whose circuit is open is skipped; with no
+    replica configured or available, reads use the primary. Reads that fail
+    on a replica are retried on the primary by AsyncDatabaseService. Writes
+    never come through here.
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(self, urls: List[str], strategy: str = "round_robin"):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy: {strategy} (expected one of {', '.join(self.STRATEGIES)})")
+        self.strategy = strategy
+        self.replicas = [Replica(f"replica{number}", url) for number, url in enumerate(urls, start=1)]
+        self._turn = itertools.count()
+        self.primary_reads_total = 0
+
+    def pick(self) -> Optional[Replica]:
+        """Replica for the next read session, or None to read from the primary"""
+        if not self.replicas:
+            return None
+        available = [replica for replica in self.replicas if replica.available()]
+        if not available:
+            return None
+        start = next(self._turn) % len(available)
+        rotated = available[start:] + available[:start]
+        if self.strategy == "least_loaded":
+            return min(rotated, key=lambda replica: replica.in_flight)
+        return rotated[0]
+
+    @asynccontextmanager
+    async def session(self):
+        """Async session for read-only service calls"""
+        replica = self.pick()
+        if replica is None:
+            self.primary_reads_total += 1
+            DB_READ_SESSIONS.labels("primary").inc()
+            async with primary_session() as db:
+                yield db
+            return
+
+        session_factory = replica.get_session_factory()
+        replica.in_flight += 1
+        replica.sessions_total += 1
+        DB_READ_SESSIONS.labels(replica.name).inc()
+        try:
+            async with session_factory() as db:
+                yield db
+        finally:
+            replica.in_flight -= 1
+
+    def replica_for(self, db: AsyncSession) -> Optional[Replica]:
+        """The replica `db` is bound to, or None for a primary session"""
+        for replica in self.replicas:
+            if replica.engine is not None and db.bind is replica.engine:
+                return replica
+        return None
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def reset_after_fork(self):
+        for replica in self.replicas:
+            replica.forget_engine()
+
+    def snapshot(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "primary_reads_total": self.primary_reads_total,
+            "replicas": [replica.snapshot() for replica in self.replicas]
+        }
+
+@asynccontextmanager
+async def primary_session():
+    """Async session on the primary outside a route dependency"""
+    if AsyncSessionLocal is None:
+        create_async_session_factory()
+    
+    async with AsyncSessionLocal() as db:
+        yield db
+
+replica_set = ReplicaSet(DB_REPLICA_URLS, DB_REPLICA_STRATEGY)
+
+async def get_async_read_session():
+    """
+    Get an async session for read-only route handlers
+
+    Served by a read replica when one is configured, so it may lag the
+    primary; handlers that must see their own writes use
+    get_async_database_session instead.
+    """
+    async with replica_set.session() as db:
+        yield db
+
+def is_primary_session(db: AsyncSession) -> bool:
+    """Whether `db` reads from the primary (no replica served it)"""
+    return db.bind is async_engine
+
+async def dispose_async_engine():
+    """Close pooled async connections, replicas included (application shutdown)"""
+    global async_engine, AsyncSessionLocal
+    
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+        AsyncSessionLocal = None
+    await replica_set.dispose()
+
+def reset_engines_after_fork():
+    """
+    Forget engines inherited from a parent process (call first thing in a forked worker)
+
+    dispose(close=False) drops the parent's pooled connections without closing
+    sockets the parent still owns; the worker then lazily builds its own engines.
+    """
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
+    
+    if engine is not None:
+        engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+    
+    engine = None
+    SessionLocal = None
+    async_engine = None
+    AsyncSessionLocal = None
+    replica_set.reset_after_fork()
+    credential_provider.reset_client()
+
 def init_database():
     """Initialize database connection"""
     try:
@@ -148,16 +467,14 @@ def init_database():
         raise
 
 def create_tables():
-    """Create database tables"""
+    """Create database tables by applying pending schema migrations"""
     try:
         if engine is None:
             create_database_engine()
             
-        # Import all models to ensure they're registered
-        from app.models import database_models
+        from app.migrations import run_migrations
         
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
         logger.info("Database tables created successfully")
         
     except Exception as e:
@@ -0,0 +1,147 @@
+import os
+import time
+from typing import Dict, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Set (by serve.py, or by hand) before the app is imported to aggregate metrics across workers
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time from request start until the response is fully sent",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "Connections currently checked out of the pool",
+    ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections", "Connections open beyond pool_size (negative while the pool is filling)",
+    ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time to obtain a pooled connection, including waiting for a free one",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "Statements slower than SLOW_QUERY_THRESHOLD_MS (logged or not)",
+    ["engine"]
+)
+
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions_total", "Read-only sessions by the engine that served them (primary when no replica was available)",
+    ["engine"]
+)
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state", "1 for the state a circuit is in, 0 for the others (summed: workers in that state)",
+    ["circuit", "state"], multiprocess_mode="livesum"
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total", "Circuit state changes; from_state closed or half_open to open counts openings",
+    ["circuit", "from_state", "to_state"]
+)
+CIRCUIT_REJECTED = Counter(
+    "circuit_breaker_rejected_total", "Calls refused without touching the database because the circuit was open",
+    ["circuit"]
+)
+
+FALLBACKS = Counter(
+    "fallbacks_total", "Requests served by a fallback because the database call failed",
+    ["route", "target"]
+)
+
+# Label children resolved once per label set; prometheus_client's labels() validates and locks every call
+_request_children: Dict[Tuple[str, str, str], tuple] = {}
+
+def observe_request(method: str, route: str, status: int, duration_seconds: float):
+    """Count one finished request and record its latency"""
+    key = (method, route, str(status))
+    children = _request_children.get(key)
+    if children is None:
+        children = (HTTP_REQUESTS.labels(*key), HTTP_REQUEST_DURATION.labels(method, route))
+        _request_children[key] = children
+    counter, histogram = children
+    counter.inc()
+    histogram.observe(duration_seconds)
+
+def record_fallback(route: str, target: str):
+    """Count a request that fell back from the database to `target` ("static", "memory" or "outbox")"""
+    FALLBACKS.labels(route, target).inc()
+
+def record_circuit_state(circuit: str, states: Tuple[str, ...], state: str):
+    """Mark `state` as the current one of `circuit` and clear the others"""
+    for name in states:
+        CIRCUIT_STATE.labels(circuit, name).set(1 if name == state else 0)
+
+def record_circuit_transition(circuit: str, states: Tuple[str, ...], previous: str, state: str):
+    """Count a state change of `circuit` and update its state gauge"""
+    CIRCUIT_TRANSITIONS.labels(circuit, previous, state).inc()
+    record_circuit_state(circuit, states, state)
+
+def timed_pool_class(pool_class: type, engine_label: str) -> type:
+    """
+    Subclass of a QueuePool class that records checkout wait time
+
+    The histogram child lives on the class, so pools recreated by
+    engine.dispose() keep reporting under the same label.
+    """
+    wait_histogram = DB_POOL_WAIT.labels(engine_label)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return pool_class._do_get(self)
+        finally:
+            wait_histogram.observe(time.perf_counter() - started)
+
+    return type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+
+def install_pool_metrics(sync_engine, engine_label: str):
+    """
+    Keep the pool gauges of `sync_engine` current on every checkout and checkin
+
+    Set from events rather than read at scrape time so the multiprocess
+    collector can sum them across workers. The checkin event fires before
+    the pool takes the connection back, so that one is already subtracted
+    (and, when the pool is full, so is the overflow connection it closes).
+    """
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine_label)
+    overflow = DB_POOL_OVERFLOW.labels(engine_label)
+
+    def on_checkout(*args):
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            checked_out.set(pool.checkedout())
+            overflow.set(pool.overflow())
+
+    def on_checkin(*args):
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            checked_out.set(pool.checkedout() - 1)
+            overflow.set(pool.overflow() - (1 if pool.checkedin() >= pool.size() else 0))
+
+    event.listen(sync_engine, "checkout", on_checkout)
+    event.listen(sync_engine, "checkin", on_checkin)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition-format metrics, summed over every worker in multiprocess mode"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
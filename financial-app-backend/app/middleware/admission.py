@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds clients are told to wait before retrying a shed request
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+class RouteGroup:
+    """Concurrency budget shared by every request matching a path prefix and method set"""
+
+    def __init__(
+        self,
+        name: str,
+        path_prefix: str,
+        methods: Tuple[str, ...],
+        max_concurrency: int,
+        max_queue_wait: float,
+        max_queue_depth: int
+    ):
+        self.name = name
+        self.path_prefix = path_prefix
+        self.methods = methods
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.max_queue_depth = max_queue_depth
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.admitted_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @classmethod
+    def from_env(cls, name: str, path_prefix: str, methods: Tuple[str, ...],
+                 max_concurrency: int, max_queue_wait_ms: int, max_queue_depth: int) -> "RouteGroup":
+        """Build a group whose limits can be overridden with ADMISSION_<NAME>_* variables"""
+        env_prefix = f"ADMISSION_{name.upper()}"
+        return cls(
+            name=name,
+            path_prefix=path_prefix,
+            methods=methods,
+            max_concurrency=int(os.getenv(f"{env_prefix}_CONCURRENCY", max_concurrency)),
+            max_queue_wait=int(os.getenv(f"{env_prefix}_MAX_WAIT_MS", max_queue_wait_ms)) / 1000,
+            max_queue_depth=int(os.getenv(f"{env_prefix}_MAX_QUEUE", max_queue_depth))
+        )
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and path.startswith(self.path_prefix)
+
+    @property
+    def rejected_total(self) -> int:
+        return self.rejected_queue_full + self.rejected_timeout
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting at most max_queue_wait; False means the request is shed"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            if self.queue_depth >= self.max_queue_depth or self.max_queue_wait <= 0:
+                self.rejected_queue_full += 1
+                return False
+
+            self.queue_depth += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_queue_wait)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return False
+            finally:
+                self.queue_depth -= 1
+
+        self.in_flight += 1
+        self.admitted_total += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        """Current limits, queue depth and rejection counters"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_wait_ms": int(self.max_queue_wait * 1000),
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout
+        }
+
+def pool_connections() -> int:
+    """
+    Connections of one worker's database pool that requests may use
+
+    The pool (serve.py sizes it per worker from DB_CONNECTION_BUDGET) less
+    DB_BACKGROUND_CONNECTIONS, kept free for the health prober, outbox
+    replayer and statistics recounter.
+    """
+    pool = int(os.getenv("DB_POOL_SIZE", "10")) + int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    return max(1, pool - int(os.getenv("DB_BACKGROUND_CONNECTIONS", "3")))
+
+def load_route_groups(connections: Optional[int] = None) -> List[RouteGroup]:
+    """
+    Default budgets, sized against this worker's connection pool
+
+    Exports hold a connection for the whole download, so they get one per
+    15 pooled connections (at least one) and never eat into the enrollment
+    read budget. The remaining connections are split 2:1 between enrollment
+    writes and reads, so together they can't queue inside the pool. Plan
+    reads are mostly served from the plan cache without a connection and
+    get a separate, larger budget. Groups are matched in order, so the
+    export prefix comes before /api/enroll.
+    """
+    if connections is None:
+        connections = pool_connections()
+    exports = max(1, connections // 15)
+    writes = max(1, (connections - exports) * 2 // 3)
+    reads = max(1, connections - exports - writes)
+
+    return [
+        RouteGroup.from_env("enroll_writes", "/api/enroll", ("POST",),
+                            max_concurrency=writes, max_queue_wait_ms=500, max_queue_depth=100),
+        RouteGroup.from_env("enroll_exports", "/api/enroll/export", ("GET",),
+                            max_concurrency=exports, max_queue_wait_ms=1000, max_queue_depth=4),
+        RouteGroup.from_env("enroll_reads", "/api/enroll", ("GET",),
+                            max_concurrency=reads, max_queue_wait_ms=250, max_queue_depth=50),
+        RouteGroup.from_env("plans_reads", "/api/plans", ("GET", "HEAD"),
+                            max_concurrency=50, max_queue_wait_ms=250, max_queue_depth=200)
+    ]
+
+route_groups = load_route_groups()
+
+def admission_snapshot(groups: Optional[List[RouteGroup]] = None) -> dict:
+    """Queue depth and rejection counts for every route group"""
+    return {group.name: group.snapshot() for group in (groups or route_groups)}
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that bounds concurrency per route group and sheds load
+
+    Requests beyond a group's concurrency limit wait in a bounded queue for
+    at most the group's max wait; anything else fails fast with 503 and a
+    Retry-After header instead of piling up inside the connection pool.
+    """
+
+    def __init__(self, app, groups: Optional[List[RouteGroup]] = None):
+        self.app = app
+        self.groups = groups if groups is not None else route_groups
+
+    def match(self, method: str, path: str) -> Optional[RouteGroup]:
+        for group in self.groups:
+            if group.matches(method, path):
+                return group
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group = self.match(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await group.acquire():
+            logger.warning(f"Shedding {scope['method']} {scope['path']}: route group '{group.name}' over capacity")
+            await self._reject(group, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
+
+    @staticmethod
+    async def _reject(group: RouteGroup, send):
+        body = json.dumps({
+            "success": False,
+            "message": "Service is temporarily over capacity, please retry shortly",
+            "details": {"route_group": group.name}
+        }).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(ADMISSION_RETRY_AFTER_SECONDS).encode("latin-1"))
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,53 @@
+import time
+from starlette.routing import replace_params
+from app.metrics import observe_request
+
+# Label for requests no route matched, so scanners can't blow up label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+def route_template(scope) -> str:
+    """Full path template of the matched route, e.g. /api/enroll/{enrollment_id}"""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+
+    # Some FastAPI versions report routes of an included router without the
+    # include prefix; recover it from the part of the path the route didn't match
+    filled, _ = replace_params(template, getattr(route, "param_convertors", {}), dict(scope.get("path_params", {})))
+    path = scope["path"]
+    if filled != path and path.endswith(filled):
+        return path[:len(path) - len(filled)] + template
+    return template
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts and latency
+
+    Requests are labelled with the route template (/api/enroll/{enrollment_id}),
+    not the raw path. Latency runs until the last body chunk is sent, so
+    streamed exports are measured in full. Outermost, so shed (503) requests
+    are counted too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            observe_request(scope["method"], route_template(scope), status_code, time.perf_counter() - started)
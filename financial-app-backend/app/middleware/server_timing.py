@@ -0,0 +1,34 @@
+from app.profiling import SqlStats, current_sql_stats
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that collects the SQL work of each request
+
+    Every statement the request runs (through either engine) is counted into
+    a per-request SqlStats, and the totals are sent to the client in a
+    Server-Timing header. Streamed responses report what ran before the
+    headers went out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SqlStats()
+        token = current_sql_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_sql_stats.reset(token)
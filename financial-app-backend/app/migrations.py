@@ -0,0 +1,140 @@
+# Versioned schema migrations applied by bootstrap.py
+from sqlalchemy import Column, Integer, String, DateTime, MetaData, Table, inspect, select, text
+from sqlalchemy.sql import func
+from app.database import Base
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bookkeeping table recording which migrations have been applied
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now())
+)
+
+def add_column_if_missing(connection, table_name: str, column_name: str, column_ddl: str):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists (fresh schemas include it)"""
+    columns = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    if column_name not in columns:
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_ddl}"))
+
+def create_index_if_missing(connection, table_name: str, index_name: str, columns: str, unique: bool = False):
+    """CREATE INDEX unless an index with that name already exists"""
+    indexes = {index["name"] for index in inspect(connection).get_indexes(table_name)}
+    if index_name not in indexes:
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        connection.execute(text(f"CREATE {kind} {index_name} ON {table_name} ({columns})"))
+
+def _create_initial_schema(connection):
+    from app.models import database_models  # noqa: F401 - registers models
+    Base.metadata.create_all(bind=connection)
+
+def _add_enrollment_pagination_indexes(connection):
+    create_index_if_missing(connection, "enrollments", "ix_enrollments_date_id", "enrollment_date, id")
+    create_index_if_missing(connection, "enrollments", "ix_enrollments_plan_date_id", "plan_id, enrollment_date, id")
+    create_index_if_missing(connection, "enrollments", "ix_enrollments_status_date_id", "status, enrollment_date, id")
+
+def _add_enrollment_statistics(connection):
+    from app.models.database_models import EnrollmentEmailCount, EnrollmentStatistic
+
+    Base.metadata.create_all(
+        bind=connection,
+        tables=[EnrollmentStatistic.__table__, EnrollmentEmailCount.__table__]
+    )
+    # Counters are backfilled by migration 4, once email_normalized exists to count by
+
+def _add_normalized_email(connection):
+    from app.services.statistics_service import recount_enrollment_statistics
+
+    add_column_if_missing(connection, "enrollments", "email_normalized", "VARCHAR(100)")
+    connection.execute(text(
+        "UPDATE enrollments SET email_normalized = LOWER(TRIM(email)) WHERE email_normalized IS NULL"
+    ))
+    create_index_if_missing(
+        connection, "enrollments", "ix_enrollments_email_normalized_date_id", "email_normalized, enrollment_date, id"
+    )
+    recount_enrollment_statistics(connection)
+
+def _add_outbox_ref(connection):
+    add_column_if_missing(connection, "enrollments", "outbox_ref", "VARCHAR(36)")
+    create_index_if_missing(connection, "enrollments", "ux_enrollments_outbox_ref", "outbox_ref", unique=True)
+
+def _add_plan_numeric_attributes(connection):
+    from app.models.schemas import parse_interest_rate_bps, parse_term_months
+
+    add_column_if_missing(connection, "financial_plans", "interest_rate_bps", "INTEGER")
+    add_column_if_missing(connection, "financial_plans", "term_months", "INTEGER")
+
+    rows = connection.execute(text(
+        "SELECT id, interest_rate, term FROM financial_plans WHERE interest_rate_bps IS NULL OR term_months IS NULL"
+    )).all()
+    updates = []
+    for plan_id, interest_rate, term in rows:
+        try:
+            updates.append({"id": plan_id, "bps": parse_interest_rate_bps(interest_rate), "months": parse_term_months(term)})
+        except ValueError as e:
+            # Left NULL: the plan is listed as before but never matches numeric search filters
+            logger.warning(f"Plan {plan_id} not backfilled: {str(e)}")
+    if updates:
+        connection.execute(
+            text("UPDATE financial_plans SET interest_rate_bps = :bps, term_months = :months WHERE id = :id"),
+            updates
+        )
+
+    create_index_if_missing(connection, "financial_plans", "ix_financial_plans_active_rate", "is_active, interest_rate_bps")
+    create_index_if_missing(connection, "financial_plans", "ix_financial_plans_active_term", "is_active, term_months")
+    create_index_if_missing(
+        connection, "financial_plans", "ix_financial_plans_active_contribution", "is_active, min_contribution, max_contribution"
+    )
+
+def _add_idempotency_keys(connection):
+    from app.models.database_models import IdempotencyKey
+
+    Base.metadata.create_all(bind=connection, tables=[IdempotencyKey.__table__])
+
+# Ordered list of (version, description, upgrade function). Append only; never renumber.
+# Upgrades must be idempotent because version 1 creates tables from the current models.
+MIGRATIONS = [
+    (1, "initial schema", _create_initial_schema),
+    (2, "enrollment keyset pagination indexes", _add_enrollment_pagination_indexes),
+    (3, "incremental enrollment statistics", _add_enrollment_statistics),
+    (4, "normalized enrollment email", _add_normalized_email),
+    (5, "enrollment outbox reference", _add_outbox_ref),
+    (6, "numeric plan rate and term", _add_plan_numeric_attributes),
+    (7, "shared idempotency keys", _add_idempotency_keys),
+]
+
+def get_applied_versions(connection) -> set:
+    _migration_metadata.create_all(bind=connection)
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+def run_migrations(engine) -> list:
+    """Apply pending migrations in order, each in its own transaction"""
+    applied = []
+
+    with engine.begin() as connection:
+        done = get_applied_versions(connection)
+
+    for version, description, upgrade in MIGRATIONS:
+        if version in done:
+            continue
+
+        logger.info(f"Applying migration {version}: {description}")
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(schema_migrations.insert().values(version=version, description=description))
+        applied.append(version)
+
+    if not applied:
+        logger.info("Database schema is up to date")
+    return applied
+
+def pending_migrations(engine) -> list:
+    """Migrations not yet applied, as (version, description)"""
+    with engine.begin() as connection:
+        done = get_applied_versions(connection)
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in done]
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.schemas import parse_interest_rate_bps, parse_plan_attribute, parse_term_months
 
 class FinancialPlan(Base):
     """Financial Plan model"""
@@ -11,6 +12,8 @@ class FinancialPlan(Base):
     name = Column(String(100), nullable=False, index=True)
     interest_rate = Column(String(10), nullable=False)
     term = Column(String(50), nullable=False)
+    interest_rate_bps = Column(Integer)  # parse_interest_rate_bps(interest_rate), set on every write
+    term_months = Column(Integer)  # parse_term_months(term), set on every write
     min_contribution = Column(Integer, nullable=False)
     max_contribution = Column(Integer, nullable=False)
     description = Column(Text, nullable=False)
@@ -21,6 +24,22 @@ class FinancialPlan(Base):
     # Relationship with benefits
     benefits = relationship("PlanBenefit", back_populates="plan", cascade="all, delete-orphan")
     enrollments = relationship("Enrollment", back_populates="plan")
+    
+    # Plan search filters: rate floor, term range and contribution amount over the active plans
+    __table_args__ = (
+        Index("ix_financial_plans_active_rate", "is_active", "interest_rate_bps"),
+        Index("ix_financial_plans_active_term", "is_active", "term_months"),
+        Index("ix_financial_plans_active_contribution", "is_active", "min_contribution", "max_contribution"),
+    )
+
+@event.listens_for(FinancialPlan, "before_insert")
+@event.listens_for(FinancialPlan, "before_update")
+def _set_numeric_plan_attributes(mapper, connection, plan):
+    """Keep the numeric columns in step with the display strings (NULL when unparseable, as in migration 6)"""
+    plan.interest_rate_bps = parse_plan_attribute(
+        parse_interest_rate_bps, plan.interest_rate, plan.name, "interest_rate_bps"
+    )
+    plan.term_months = parse_plan_attribute(parse_term_months, plan.term, plan.name, "term_months")
 
 class PlanBenefit(Base):
     """Plan Benefits model"""
@@ -42,15 +61,51 @@ class Enrollment(Base):
     plan_id = Column(Integer, ForeignKey("financial_plans.id"), nullable=False)
     full_name = Column(String(100), nullable=False)
     email = Column(String(100), nullable=False, index=True)
+    email_normalized = Column(String(100))  # normalize_email(email), set on insert
     phone = Column(String(20), nullable=False)
     monthly_contribution = Column(Integer, nullable=False)
     enrollment_date = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String(20), default="pending")  # pending, approved, rejected
+    outbox_ref = Column(String(36))  # set when replayed from the outbox; deduplicates replays
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship
     plan = relationship("FinancialPlan", back_populates="enrollments")
+    
+    # Keyset pagination indexes: newest-first listing, optionally filtered by plan, status or email
+    __table_args__ = (
+        Index("ix_enrollments_date_id", "enrollment_date", "id"),
+        Index("ix_enrollments_plan_date_id", "plan_id", "enrollment_date", "id"),
+        Index("ix_enrollments_status_date_id", "status", "enrollment_date", "id"),
+        Index("ix_enrollments_email_normalized_date_id", "email_normalized", "enrollment_date", "id"),
+        Index("ux_enrollments_outbox_ref", "outbox_ref", unique=True),
+    )
+
+class EnrollmentStatistic(Base):
+    """Running enrollment counter, maintained in the same transaction as each insert"""
+    __tablename__ = "enrollment_statistics"
+    
+    dimension = Column(String(20), primary_key=True)  # total, plan, status, emails
+    name = Column(String(100), primary_key=True)  # plan id, status, "unique" or "multiple"
+    value = Column(Integer, nullable=False, default=0)
+
+class EnrollmentEmailCount(Base):
+    """Enrollments per email, used to maintain the unique/multiple email counters"""
+    __tablename__ = "enrollment_email_counts"
+    
+    email = Column(String(100), primary_key=True)
+    enrollment_count = Column(Integer, nullable=False, default=0)
+
+class IdempotencyKey(Base):
+    """Idempotency-Key claim and stored response, shared by every worker"""
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    status_code = Column(Integer)  # NULL while the first request is still running
+    response = Column(Text)  # JSON response body
+    created_at = Column(DateTime, nullable=False, index=True)  # naive UTC, set when claimed
 
 class User(Base):
     """User model for future authentication"""
@@ -1,6 +1,62 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, ValidationError, model_validator
+from typing import Callable, List, Optional
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+def normalize_email(email: str) -> str:
+    """Canonical form used to match enrollments of the same address (computed once, at write time)"""
+    return email.strip().lower()
+
+def format_validation_error(error: ValidationError) -> str:
+    """`field: message` for each error, joined by '; ' (per-item messages in batch results)"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+_INTEREST_RATE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*%?\s*$")
+_TERM = re.compile(r"^\s*(\d+)\s*(months?|years?)\s*$", re.IGNORECASE)
+
+def parse_interest_rate_bps(interest_rate: str) -> int:
+    """Display rate to basis points: "3.5%" -> 350; raises ValueError if unrecognized"""
+    match = _INTEREST_RATE.match(interest_rate)
+    if not match:
+        raise ValueError(f"Unrecognized interest rate: {interest_rate!r}")
+    return int((Decimal(match.group(1)) * 100).to_integral_value(ROUND_HALF_UP))
+
+def parse_term_months(term: str) -> int:
+    """Display term to months: "24 months" -> 24, "5 years" -> 60; raises ValueError if unrecognized"""
+    match = _TERM.match(term)
+    if not match:
+        raise ValueError(f"Unrecognized term: {term!r}")
+    months = int(match.group(1))
+    return months * 12 if match.group(2).lower().startswith("year") else months
+
+def parse_plan_attribute(parse: Callable[[str], int], value, plan_name: str, attribute: str) -> Optional[int]:
+    """
+    parse(value), or None with a logged warning when the string is not recognized
+
+    Plans with an unparseable rate or term are still served; they just never
+    match the numeric search filters (as after migration 6's backfill).
+    """
+    try:
+        return parse(value)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Plan {plan_name!r}: {attribute} left empty: {str(e)}")
+        return None
+
+# GET /api/plans/search sort keys (prefix "-" for descending) and the plan attribute each sorts by
+PLAN_SORT_KEYS = {
+    "id": "id",
+    "name": "name",
+    "interest_rate": "interest_rate_bps",
+    "term": "term_months",
+    "min_contribution": "min_contribution",
+    "max_contribution": "max_contribution"
+}
 
 class FinancialPlan(BaseModel):
     id: int
@@ -11,6 +67,19 @@ class FinancialPlan(BaseModel):
     max_contribution: int
     benefits: List[str]
     description: str
+    # Numeric forms of interest_rate and term, derived from them when not given
+    interest_rate_bps: Optional[int] = None
+    term_months: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _derive_numeric_attributes(self):
+        if self.interest_rate_bps is None:
+            self.interest_rate_bps = parse_plan_attribute(
+                parse_interest_rate_bps, self.interest_rate, self.name, "interest_rate_bps"
+            )
+        if self.term_months is None:
+            self.term_months = parse_plan_attribute(parse_term_months, self.term, self.name, "term_months")
+        return self
 
 class EnrollmentRequest(BaseModel):
     name: str = Field(..., min_length=2, max_length=100, description="Full name of the applicant")
@@ -35,3 +104,20 @@ class PlansResponse(BaseModel):
     success: bool = True
     data: List[FinancialPlan]
     total_plans: int
+
+class BatchEnrollmentRequest(BaseModel):
+    # Items are validated one by one so a bad item fails alone instead of the whole batch
+    enrollments: List[dict] = Field(..., min_length=1, description="EnrollmentRequest objects to create")
+
+class BatchEnrollmentItemResult(BaseModel):
+    index: int
+    success: bool
+    enrollment_id: Optional[str] = None
+    message: str
+
+class BatchEnrollmentResponse(BaseModel):
+    success: bool
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchEnrollmentItemResult]
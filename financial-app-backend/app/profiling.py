@@ -0,0 +1,115 @@
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.metrics import DB_SLOW_QUERIES
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-request query counting and the Server-Timing header (disable with false)
+SQL_PROFILING = os.getenv("SQL_PROFILING", "true").lower() == "true"
+# Statements slower than this are slow queries; a sample of them is logged
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_LOG_SAMPLE_RATE", "0.1"))
+
+_STARTED = "_profiling_started_at"
+
+class SqlStats:
+    """SQL work done on behalf of one request"""
+    __slots__ = ("queries", "query_seconds", "commits", "commit_seconds", "commit_started_at")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.commits = 0
+        self.commit_seconds = 0.0
+        self.commit_started_at: Optional[float] = None
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in milliseconds)"""
+        return (
+            f'db;dur={self.query_seconds * 1000:.3f};desc="{self.queries} queries", '
+            f'db-commit;dur={self.commit_seconds * 1000:.3f};desc="{self.commits} commits"'
+        )
+
+# Set by ServerTimingMiddleware; database work outside a request is not attributed
+current_sql_stats: ContextVar[Optional[SqlStats]] = ContextVar("current_sql_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS = re.compile(r"(VALUES\s*\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """
+    Statement shape with every literal and placeholder replaced by ?
+
+    IN lists and multi-row VALUES collapse to one (?...) so statements that
+    differ only in batch size normalize to the same text.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def _parameter_count(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"{len(parameters)} parameter sets"
+    return f"{len(parameters) if parameters else 0} parameters"
+
+def _log_slow_query(engine_label: str, statement: str, parameters, executemany: bool, elapsed: float):
+    DB_SLOW_QUERIES.labels(engine_label).inc()
+    if random.random() >= SLOW_QUERY_LOG_SAMPLE_RATE:
+        return
+    logger.warning(
+        f"Slow query on {engine_label} engine ({elapsed * 1000:.1f} ms, "
+        f"{_parameter_count(parameters, executemany)} redacted): {normalize_sql(statement)}"
+    )
+
+def install_sql_profiling(sync_engine, engine_label: str):
+    """Time every statement on `sync_engine` into the current request's SqlStats and the slow-query log"""
+    if not SQL_PROFILING:
+        return
+    slow_seconds = SLOW_QUERY_THRESHOLD_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        setattr(context, _STARTED, time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, _STARTED, None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats = current_sql_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+        if elapsed >= slow_seconds:
+            _log_slow_query(engine_label, statement, parameters, executemany, elapsed)
+
+    @event.listens_for(sync_engine, "commit")
+    def _commit(conn):
+        stats = current_sql_stats.get()
+        if stats is not None:
+            stats.commit_started_at = time.perf_counter()
+
+# The engine "commit" event fires before COMMIT is sent; the session event once it completed
+@event.listens_for(Session, "after_commit")
+def _record_commit(session):
+    stats = current_sql_stats.get()
+    if stats is None or stats.commit_started_at is None:
+        return
+    stats.commits += 1
+    stats.commit_seconds += time.perf_counter() - stats.commit_started_at
+    stats.commit_started_at = None
@@ -0,0 +1,39 @@
+import json
+from decimal import Decimal
+from typing import Any
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional; the standard encoder is used without it
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the few non-native types service output may contain"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize trusted service output to JSON bytes without re-validating it"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (falls back to the standard encoder)
+
+    The application default. Routes that return a FastJSONResponse built from
+    service dicts skip FastAPI's response-model validation and
+    jsonable_encoder pass; their response_model still documents the shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,9 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from app.models.schemas import EnrollmentRequest, EnrollmentResponse, ErrorResponse
-from app.database import get_database_session
-from app.services.database_service import DatabaseService
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import (
+    EnrollmentRequest, EnrollmentResponse, ErrorResponse,
+    BatchEnrollmentRequest, BatchEnrollmentResponse
+)
+from app.database import get_async_database_session, get_async_read_session, is_primary_session
+from app.metrics import record_fallback
+from app.responses import FastJSONResponse
+from app.services.database_service import (
+    AsyncDatabaseService,
+    BatchInsertInterrupted,
+    ENROLLMENT_BATCH_MAX_ITEMS,
+    ENROLLMENT_PAGE_DEFAULT_LIMIT,
+    ENROLLMENT_PAGE_MAX_LIMIT
+)
 from app.services.enrollment_service import EnrollmentService
+from app.services.export_service import EXPORT_MEDIA_TYPES, export_enrollments, export_filename
+from app.services.outbox import OutboxFullError
+from app.services.idempotency import enrollment_idempotency_store, IdempotencyKeyConflict, IdempotencyKeyInProgress
+from datetime import datetime
+from typing import Optional
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,7 +31,13 @@ router = APIRouter(prefix="/enroll", tags=["Enrollment"])
 @router.post("/", response_model=EnrollmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_enrollment(
     enrollment_data: EnrollmentRequest,
-    db: Session = Depends(get_database_session)
+    db: AsyncSession = Depends(get_async_database_session),
+    idempotency_key: Optional[str] = Header(
+        default=None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key; retries with the same key replay the original response"
+    )
 ):
     """
     Create a new enrollment for a financial plan
@@ -21,6 +45,7 @@ async def create_enrollment(
     Args:
         enrollment_data (EnrollmentRequest): User enrollment information
         db: Database session
+        idempotency_key: Optional Idempotency-Key header
         
     Returns:
         EnrollmentResponse: Success status and enrollment details
@@ -28,16 +53,51 @@ async def create_enrollment(
     Raises:
         HTTPException: If validation fails or enrollment cannot be created
     """
+    if idempotency_key is None:
+        body = await _create_enrollment(enrollment_data, db)
+        return FastJSONResponse(status_code=status.HTTP_201_CREATED, content=body)
+    
+    async def attempt():
+        try:
+            return status.HTTP_201_CREATED, await _create_enrollment(enrollment_data, db)
+        except HTTPException as e:
+            return e.status_code, {"detail": e.detail}
+    
+    fingerprint = hashlib.sha256(enrollment_data.model_dump_json().encode("utf-8")).hexdigest()
+    
+    try:
+        status_code, body, replayed = await enrollment_idempotency_store.execute(
+            idempotency_key, fingerprint, attempt
+        )
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except IdempotencyKeyInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    
+    headers = {"Idempotency-Key": idempotency_key}
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return FastJSONResponse(status_code=status_code, content=body, headers=headers)
+
+async def _create_enrollment(enrollment_data: EnrollmentRequest, db: AsyncSession) -> dict:
+    """Create the enrollment in the database, falling back to the outbox; returns the EnrollmentResponse body"""
     try:
         # Try database first
         try:
-            enrollment = DatabaseService.create_enrollment(db, enrollment_data)
+            enrollment = await AsyncDatabaseService.create_enrollment(db, enrollment_data)
             
-            return EnrollmentResponse(
-                success=True,
-                message="Enrollment submitted successfully! You will receive a confirmation email shortly.",
-                enrollment_id=str(enrollment["id"]),  # Convert to string
-                enrollment_data={
+            return {
+                "success": True,
+                "message": "Enrollment submitted successfully! You will receive a confirmation email shortly.",
+                "enrollment_id": str(enrollment["id"]),  # Convert to string
+                "enrollment_data": {
                     "enrollment_id": str(enrollment["id"]),
                     "name": enrollment["full_name"],
                     "email": enrollment["email"],
@@ -50,12 +110,23 @@ async def create_enrollment(
                     "enrollment_date": enrollment["enrollment_date"],
                     "status": enrollment["status"]
                 }
-            )
+            }
             
+        except ValueError:
+            # Validation failures (unknown plan, contribution limits) are the client's, not a fallback
+            raise
         except Exception as db_error:
             logger.warning(f"Database error, falling back to service: {str(db_error)}")
-            # Fallback to original service
-            result = EnrollmentService.create_enrollment(enrollment_data)
+            record_fallback("enroll_create", "outbox")
+            # Fallback: accept into the durable outbox, replayed into the database on recovery
+            try:
+                result = await EnrollmentService.create_enrollment(enrollment_data)
+            except OutboxFullError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=str(e),
+                    headers={"Retry-After": "5"}
+                )
             
             if not result.success:
                 raise HTTPException(
@@ -63,7 +134,7 @@ async def create_enrollment(
                     detail=result.message
                 )
             
-            return result
+            return result.model_dump()
         
     except ValueError as e:
         raise HTTPException(
@@ -79,17 +150,137 @@ async def create_enrollment(
             detail=f"Internal server error: {str(e)}"
         )
 
+@router.post("/batch", response_model=BatchEnrollmentResponse)
+async def create_enrollments_batch(
+    batch: BatchEnrollmentRequest,
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """
+    Create many enrollments in one request
+    
+    Items are validated individually against the plan catalog and valid
+    rows are bulk inserted in chunked transactions.
+    
+    Args:
+        batch (BatchEnrollmentRequest): Up to ENROLLMENT_BATCH_MAX_ITEMS enrollment requests
+        db: Database session
+        
+    Returns:
+        BatchEnrollmentResponse: Per-item success/failure with generated IDs
+    """
+    if len(batch.enrollments) > ENROLLMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {ENROLLMENT_BATCH_MAX_ITEMS} enrollments"
+        )
+    
+    try:
+        # Try database first
+        try:
+            results = await AsyncDatabaseService.create_enrollments_batch(db, batch.enrollments)
+        except ValueError:
+            # Validation failures are the client's, not a fallback
+            raise
+        except BatchInsertInterrupted as interrupted:
+            logger.warning(f"Database error mid-batch, falling back to service: {str(interrupted.__cause__)}")
+            record_fallback("enroll_batch", "outbox")
+            # Committed chunks keep their ids; only the unwritten items go to the outbox
+            results = interrupted.results
+            fallback = await EnrollmentService.create_enrollments_batch(
+                [batch.enrollments[index] for index in interrupted.remaining]
+            )
+            for index, result in zip(interrupted.remaining, fallback):
+                results[index] = {**result, "index": index}
+        except Exception as db_error:
+            logger.warning(f"Database error, falling back to service: {str(db_error)}")
+            record_fallback("enroll_batch", "outbox")
+            # Fallback: accept into the durable outbox, replayed into the database on recovery
+            results = await EnrollmentService.create_enrollments_batch(batch.enrollments)
+        
+        succeeded = sum(1 for result in results if result["success"])
+        
+        return FastJSONResponse({
+            "success": succeeded == len(results),
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
+        })
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error creating enrollment batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.get("/export")
+async def export_all_enrollments(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    date_from: Optional[datetime] = Query(None, description="Only enrollments on or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only enrollments before this time"),
+    gzip: bool = Query(False, description="Compress the export with gzip")
+):
+    """
+    Stream every enrollment in a date range as NDJSON or CSV (for reconciliation)
+    
+    Args:
+        export_format (str): "ndjson" or "csv"
+        date_from (datetime): Inclusive lower bound on enrollment_date
+        date_to (datetime): Exclusive upper bound on enrollment_date
+        gzip (bool): Send the file gzip-compressed
+        
+    Returns:
+        StreamingResponse: Rows read in chunks from a server-side cursor
+    """
+    stream = export_enrollments(export_format, date_from, date_to, compress=gzip)
+    
+    # Pull the first chunk here so a database failure is still reported as an error status
+    try:
+        first_chunk = await stream.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+    except Exception as e:
+        await stream.aclose()
+        logger.error(f"Error starting enrollment export: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Enrollment export is temporarily unavailable"
+        )
+    
+    async def body():
+        try:
+            if first_chunk:
+                yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(export_format, gzip)}"'}
+    )
+
 @router.get("/{enrollment_id}")
 async def get_enrollment(
     enrollment_id: int,
-    db: Session = Depends(get_database_session)
+    db: AsyncSession = Depends(get_async_read_session),
+    primary_db: AsyncSession = Depends(get_async_database_session)
 ):
     """
     Get enrollment details by ID
     
     Args:
         enrollment_id (int): Unique enrollment identifier
-        db: Database session
+        db: Read session (a replica when configured)
+        primary_db: Primary database session, only used when the replica misses
         
     Returns:
         dict: Enrollment details
@@ -97,7 +288,11 @@ async def get_enrollment(
     try:
         # Try database first
         try:
-            enrollment = DatabaseService.get_enrollment_by_id(db, enrollment_id)
+            enrollment = await AsyncDatabaseService.get_enrollment_by_id(db, enrollment_id)
+            
+            # A client reading back its own new enrollment can outrun replication
+            if not enrollment and not is_primary_session(db):
+                enrollment = await AsyncDatabaseService.get_enrollment_by_id(primary_db, enrollment_id)
             
             if not enrollment:
                 raise HTTPException(
@@ -105,15 +300,16 @@ async def get_enrollment(
                     detail=f"Enrollment not found with ID: {enrollment_id}"
                 )
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "data": enrollment
-            }
+            })
             
         except HTTPException:
             raise
         except Exception as db_error:
             logger.warning(f"Database error, falling back to service: {str(db_error)}")
+            record_fallback("enroll_get", "memory")
             # Fallback to original service
             enrollment = EnrollmentService.get_enrollment(str(enrollment_id))
             
@@ -123,10 +319,10 @@ async def get_enrollment(
                     detail=f"Enrollment not found with ID: {enrollment_id}"
                 )
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "data": enrollment
-            }
+            })
         
     except HTTPException:
         raise
@@ -138,22 +334,51 @@ async def get_enrollment(
         )
 
 @router.get("/")
-async def get_all_enrollments():
+async def get_all_enrollments(
+    limit: int = Query(ENROLLMENT_PAGE_DEFAULT_LIMIT, ge=1, le=ENROLLMENT_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    plan_id: Optional[int] = Query(None, description="Only enrollments in this plan"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Only enrollments with this status"),
+    db: AsyncSession = Depends(get_async_read_session)
+):
     """
-    Get all enrollments (for admin/testing purposes)
+    List enrollments newest first, one page at a time (for admin/testing purposes)
     
+    Args:
+        limit (int): Page size
+        cursor (str): Opaque cursor returned as next_cursor by the previous page
+        plan_id (int): Optional plan filter
+        status_filter (str): Optional status filter
+        db: Read session (a replica when configured)
+        
     Returns:
-        dict: List of all enrollments with statistics
+        dict: One page of enrollments and the cursor for the next page.
+              Statistics are served by /statistics/summary.
     """
     try:
-        enrollments = EnrollmentService.get_all_enrollments()
-        stats = EnrollmentService.get_enrollment_statistics()
+        try:
+            page = await AsyncDatabaseService.list_enrollments(db, limit, cursor, plan_id, status_filter)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as db_error:
+            logger.warning(f"Database error, falling back to service: {str(db_error)}")
+            record_fallback("enroll_list", "memory")
+            page = EnrollmentService.list_enrollments(limit, plan_id, status_filter)
         
-        return {
+        return FastJSONResponse({
             "success": True,
-            "data": enrollments,
-            "statistics": stats
-        }
+            "data": page["items"],
+            "pagination": {
+                "limit": limit,
+                "next_cursor": page["next_cursor"],
+                "has_more": page["has_more"]
+            }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -161,25 +386,56 @@ async def get_all_enrollments():
         )
 
 @router.get("/by-email/{email}")
-async def get_enrollments_by_email(email: str):
+async def get_enrollments_by_email(
+    email: str,
+    limit: int = Query(ENROLLMENT_PAGE_DEFAULT_LIMIT, ge=1, le=ENROLLMENT_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    # Primary, not a replica: applicants look up enrollments they have just made
+    db: AsyncSession = Depends(get_async_database_session)
+):
     """
-    Get all enrollments for a specific email address
+    Get enrollments for a specific email address, newest first
     
     Args:
-        email (str): Email address to search for
+        email (str): Email address to search for (case-insensitive)
+        limit (int): Page size
+        cursor (str): Opaque cursor returned as next_cursor by the previous page
+        db: Database session
         
     Returns:
-        dict: List of enrollments for the specified email
+        dict: One page of enrollments for the email and its total enrollment count
     """
     try:
-        enrollments = EnrollmentService.get_enrollments_by_email(email)
+        try:
+            page = await AsyncDatabaseService.get_enrollments_by_email(db, email, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as db_error:
+            logger.warning(f"Database error, falling back to service: {str(db_error)}")
+            record_fallback("enroll_by_email", "memory")
+            page = {
+                "items": EnrollmentService.get_enrollments_by_email(email, limit),
+                "next_cursor": None,
+                "has_more": False,
+                "total": EnrollmentService.count_enrollments_by_email(email)
+            }
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "email": email,
-            "enrollment_count": len(enrollments),
-            "enrollments": enrollments
-        }
+            "enrollment_count": page["total"],
+            "enrollments": page["items"],
+            "pagination": {
+                "limit": limit,
+                "next_cursor": page["next_cursor"],
+                "has_more": page["has_more"]
+            }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -187,20 +443,28 @@ async def get_enrollments_by_email(email: str):
         )
 
 @router.get("/statistics/summary")
-async def get_enrollment_statistics():
+async def get_enrollment_statistics(db: AsyncSession = Depends(get_async_read_session)):
     """
     Get enrollment statistics including duplicate email information
     
+    Args:
+        db: Read session (a replica when configured)
+        
     Returns:
-        dict: Comprehensive enrollment statistics
+        dict: Counters maintained as enrollments are written (no table scan)
     """
     try:
-        stats = EnrollmentService.get_enrollment_statistics()
+        try:
+            stats = await AsyncDatabaseService.get_enrollment_statistics(db)
+        except Exception as db_error:
+            logger.warning(f"Database error, falling back to service: {str(db_error)}")
+            record_fallback("enroll_statistics", "memory")
+            stats = EnrollmentService.get_enrollment_statistics()
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "statistics": stats
-        }
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.models.schemas import PlansResponse, ErrorResponse
-from app.data.financial_plans import get_all_plans
-from app.database import get_database_session
-from app.services.database_service import DatabaseService
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import PlansResponse, ErrorResponse, PLAN_SORT_KEYS
+from app.data.financial_plans import get_all_plans, search_plans
+from app.responses import FastJSONResponse, dumps
+from app.metrics import record_fallback
+from app.database import get_async_database_session, get_async_read_session, is_primary_session
+from app.services.database_service import AsyncDatabaseService, PLAN_SEARCH_DEFAULT_LIMIT, PLAN_SEARCH_MAX_LIMIT
+from typing import Optional
+from app.services.plan_cache import plan_cache, PLANS_CACHE_FALLBACK_TTL_SECONDS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,30 +15,119 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/plans", tags=["Financial Plans"])
 
 @router.get("/", response_model=PlansResponse)
-async def get_financial_plans(db: Session = Depends(get_database_session)):
+async def get_financial_plans(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_session),
+    primary_db: AsyncSession = Depends(get_async_database_session)
+):
     """
     Get all available financial plans
-    
+
+    Served from the in-process plan catalog cache when possible. Clients that
+    send a matching If-None-Match header receive 304 Not Modified.
+
+    Args:
+        db: Read session (a replica when configured)
+        primary_db: Primary database session, only used for the first refill after a plan change
+
     Returns:
         PlansResponse: List of all financial plans with their details
     """
     try:
-        # Try to get plans from database first
+        cached = plan_cache.get()
+
+        if cached is None:
+            # Read the version before loading so concurrent changes leave the entry stale
+            version = plan_cache.version
+            ttl_seconds = None
+            from_primary = plan_cache.refill_from_primary
+            # A replica may not have the change that invalidated the cache yet
+            read_db = primary_db if from_primary and not is_primary_session(db) else db
+
+            # Try to get plans from database first
+            try:
+                plans = await AsyncDatabaseService.get_all_financial_plans(read_db)
+                logger.info(f"Retrieved {len(plans)} plans from database")
+            except Exception as db_error:
+                logger.warning(f"Database error, falling back to static data: {str(db_error)}")
+                record_fallback("plans", "static")
+                # Fallback to static data if database is unavailable
+                plans = get_all_plans()
+                ttl_seconds = PLANS_CACHE_FALLBACK_TTL_SECONDS
+                from_primary = False
+
+            # Plans come from DatabaseService or the static models, so they are not re-validated
+            body = dumps({
+                "success": True,
+                "data": plans,
+                "total_plans": len(plans)
+            })
+            cached = plan_cache.store(body, version, ttl_seconds, from_primary)
+
+        headers = {"ETag": cached.etag, "Cache-Control": cached.cache_control}
+
+        if plan_cache.etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+    except Exception as e:
+        logger.error(f"Error retrieving financial plans: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.get("/search")
+async def search_financial_plans(
+    contribution: Optional[float] = Query(None, gt=0, description="Monthly amount the plan must accept"),
+    min_term_months: Optional[int] = Query(None, ge=1, description="Shortest term, in months"),
+    max_term_months: Optional[int] = Query(None, ge=1, description="Longest term, in months"),
+    min_rate_bps: Optional[int] = Query(None, ge=0, description="Lowest interest rate, in basis points (350 = 3.5%)"),
+    sort: str = Query("id", pattern=f"^-?({'|'.join(PLAN_SORT_KEYS)})$", description="Sort key; prefix with - for descending"),
+    limit: int = Query(PLAN_SEARCH_DEFAULT_LIMIT, ge=1, le=PLAN_SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_session)
+):
+    """
+    Search the active plans, filtered and sorted server-side
+    
+    Args:
+        contribution (float): Only plans whose contribution limits include this amount
+        min_term_months (int): Only plans at least this long
+        max_term_months (int): Only plans at most this long
+        min_rate_bps (int): Only plans paying at least this rate
+        sort (str): id, name, interest_rate, term, min_contribution or max_contribution
+        limit (int): Page size
+        offset (int): Plans to skip
+        db: Read session (a replica when configured)
+        
+    Returns:
+        dict: One page of matching plans
+    """
+    if min_term_months is not None and max_term_months is not None and min_term_months > max_term_months:
+        raise HTTPException(status_code=400, detail="min_term_months must not exceed max_term_months")
+    
+    filters = (contribution, min_term_months, max_term_months, min_rate_bps, sort)
+    try:
         try:
-            plans = DatabaseService.get_all_financial_plans(db)
-            logger.info(f"Retrieved {len(plans)} plans from database")
+            page = await AsyncDatabaseService.search_financial_plans(db, *filters, limit, offset)
         except Exception as db_error:
             logger.warning(f"Database error, falling back to static data: {str(db_error)}")
-            # Fallback to static data if database is unavailable
-            plans = get_all_plans()
+            record_fallback("plans_search", "static")
+            plans = search_plans(*filters)
+            page = {"items": plans[offset:offset + limit], "has_more": len(plans) > offset + limit}
         
-        return PlansResponse(
-            success=True,
-            data=plans,
-            total_plans=len(plans)
-        )
+        return FastJSONResponse({
+            "success": True,
+            "data": page["items"],
+            "pagination": {
+                "limit": limit,
+                "offset": offset,
+                "has_more": page["has_more"]
+            }
+        })
     except Exception as e:
-        logger.error(f"Error retrieving financial plans: {str(e)}")
+        logger.error(f"Error searching financial plans: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
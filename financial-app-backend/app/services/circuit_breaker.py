@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.exc import DBAPIError, DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.metrics import CIRCUIT_REJECTED, record_circuit_state, record_circuit_transition
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Consecutive database failures that open the circuit
+DB_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("DB_CIRCUIT_FAILURE_THRESHOLD", "5"))
+# How long the circuit stays open before probe traffic is let through
+DB_CIRCUIT_RESET_TIMEOUT_SECONDS = float(os.getenv("DB_CIRCUIT_RESET_TIMEOUT_SECONDS", "10"))
+# Concurrent probe calls allowed while half-open
+DB_CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("DB_CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the database while the circuit is open"""
+
+def is_database_failure(error: BaseException) -> bool:
+    """
+    Connectivity failures count against the circuit; query and validation errors do not
+
+    Errors raised from a connectivity failure (`raise ... from e`) count too.
+    """
+    if isinstance(error, (OperationalError, InterfaceError, DisconnectionError, PoolTimeoutError, OSError)):
+        return True
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return error.__cause__ is not None and is_database_failure(error.__cause__)
+
+class LatencyStats:
+    """Count, average and maximum of call latencies"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float):
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3)
+        }
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for database calls
+
+    After `failure_threshold` consecutive connectivity failures the circuit
+    opens and calls fail immediately with CircuitOpenError, so callers go
+    straight to their fallback instead of waiting on connect timeouts. After
+    `reset_timeout_seconds` up to `half_open_max_calls` calls are let
+    through as probes: a success closes the circuit, a failure reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DB_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = DB_CIRCUIT_RESET_TIMEOUT_SECONDS,
+        half_open_max_calls: int = DB_CIRCUIT_HALF_OPEN_MAX_CALLS
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._half_open_in_flight = 0
+
+        self.transitions = Counter()
+        self.rejected_total = 0
+        self.failures_total = 0
+        self.last_transition_at: Optional[str] = None
+        self.last_failure: Optional[str] = None
+        self.latency = {CLOSED: LatencyStats(), HALF_OPEN: LatencyStats(), OPEN: LatencyStats()}
+        self._rejected_counter = CIRCUIT_REJECTED.labels(name)
+        record_circuit_state(name, STATES, CLOSED)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        previous, self._state = self._state, state
+        self.transitions[f"{previous}->{state}"] += 1
+        record_circuit_transition(self.name, STATES, previous, state)
+        self.last_transition_at = datetime.now(timezone.utc).isoformat()
+
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(f"Circuit '{self.name}' opened after {self._consecutive_failures} "
+                           f"consecutive failures: {self.last_failure}")
+        elif state == CLOSED:
+            self._consecutive_failures = 0
+            logger.info(f"Circuit '{self.name}' closed; database calls resumed")
+
+    def _admit(self) -> str:
+        """State the call runs in; raises CircuitOpenError if it may not run"""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._half_open_in_flight >= self.half_open_max_calls):
+            self.rejected_total += 1
+            self._rejected_counter.inc()
+            raise CircuitOpenError(f"Circuit '{self.name}' is open; using fallback")
+
+        if state == HALF_OPEN:
+            self._half_open_in_flight += 1
+        return state
+
+    def _on_success(self, state: str):
+        self._consecutive_failures = 0
+        if state == HALF_OPEN and self._state == HALF_OPEN:
+            self._transition(CLOSED)
+
+    def _on_failure(self, state: str, error: BaseException):
+        self.failures_total += 1
+        self._consecutive_failures += 1
+        self.last_failure = str(error) or error.__class__.__name__
+
+        if self._state == HALF_OPEN or (self._state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+            self._transition(OPEN)
+
+    @asynccontextmanager
+    async def guard(self):
+        """Run the enclosed database work through the circuit"""
+        started = time.perf_counter()
+        try:
+            state = self._admit()
+        except CircuitOpenError:
+            self.latency[OPEN].record((time.perf_counter() - started) * 1000)
+            raise
+
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            if is_database_failure(e):
+                self._on_failure(state, e)
+            else:
+                # The database answered; the error is the caller's (validation, integrity, ...)
+                self._on_success(state)
+            raise
+        else:
+            self._on_success(state)
+        finally:
+            if state == HALF_OPEN:
+                self._half_open_in_flight -= 1
+            self.latency[state].record((time.perf_counter() - started) * 1000)
+
+    def snapshot(self) -> dict:
+        """State, transition counts and call latency by the state the call ran in (open = rejected)"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout_seconds,
+            "failures_total": self.failures_total,
+            "rejected_total": self.rejected_total,
+            "transitions": dict(self.transitions),
+            "last_transition_at": self.last_transition_at,
+            "last_failure": self.last_failure,
+            "latency_ms": {state: stats.snapshot() for state, stats in self.latency.items()}
+        }
+
+database_circuit_breaker = CircuitBreaker("database")
@@ -1,37 +1,213 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from app.models.database_models import FinancialPlan, PlanBenefit, Enrollment
-from app.models.schemas import PlansResponse, EnrollmentRequest
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from app.models.database_models import FinancialPlan, PlanBenefit, Enrollment, EnrollmentEmailCount
+from sqlalchemy import insert, or_, and_, select
+from pydantic import ValidationError
+from app.models.schemas import PlansResponse, EnrollmentRequest, PLAN_SORT_KEYS, format_validation_error, normalize_email
+from app import database
+from app.services.circuit_breaker import CircuitOpenError, database_circuit_breaker, is_database_failure
+from app.services.plan_catalog import plan_catalog
+from app.services.group_commit import ENROLLMENT_GROUP_COMMIT, enrollment_group_committer
+from app.services.statistics_service import read_enrollment_statistics, record_enrollment_rows
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Mapping, Optional
+import base64
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Flat column projections used instead of hydrating full ORM objects
+_PLAN_COLUMNS = (
+    FinancialPlan.id,
+    FinancialPlan.name,
+    FinancialPlan.interest_rate,
+    FinancialPlan.term,
+    FinancialPlan.min_contribution,
+    FinancialPlan.max_contribution,
+    FinancialPlan.description,
+    FinancialPlan.interest_rate_bps,
+    FinancialPlan.term_months
+)
+
+_ENROLLMENT_COLUMNS = (
+    Enrollment.id,
+    Enrollment.plan_id,
+    Enrollment.full_name,
+    Enrollment.email,
+    Enrollment.phone,
+    Enrollment.monthly_contribution,
+    Enrollment.status,
+    Enrollment.enrollment_date
+)
+
+# Batch writes: rows per transaction and maximum items per request
+ENROLLMENT_BATCH_CHUNK_SIZE = int(os.getenv("ENROLLMENT_BATCH_CHUNK_SIZE", "500"))
+ENROLLMENT_BATCH_MAX_ITEMS = int(os.getenv("ENROLLMENT_BATCH_MAX_ITEMS", "5000"))
+
+# Enrollment listing: default and maximum page size
+ENROLLMENT_PAGE_DEFAULT_LIMIT = int(os.getenv("ENROLLMENT_PAGE_DEFAULT_LIMIT", "50"))
+ENROLLMENT_PAGE_MAX_LIMIT = int(os.getenv("ENROLLMENT_PAGE_MAX_LIMIT", "200"))
+
+# Plan search: default and maximum page size
+PLAN_SEARCH_DEFAULT_LIMIT = int(os.getenv("PLAN_SEARCH_DEFAULT_LIMIT", "50"))
+PLAN_SEARCH_MAX_LIMIT = int(os.getenv("PLAN_SEARCH_MAX_LIMIT", "200"))
+
+# Rows fetched per round trip from the server-side cursor when exporting
+ENROLLMENT_EXPORT_CHUNK_SIZE = int(os.getenv("ENROLLMENT_EXPORT_CHUNK_SIZE", "1000"))
+
+def _enrollment_to_dict(enrollment: Mapping, plan_name: str) -> dict:
+    """Shape an enrollment row mapping into the API dictionary"""
+    return {
+        "id": enrollment["id"],
+        "plan_id": enrollment["plan_id"],
+        "plan_name": plan_name,
+        "full_name": enrollment["full_name"],
+        "email": enrollment["email"],
+        "phone": enrollment["phone"],
+        "monthly_contribution": enrollment["monthly_contribution"],
+        "status": enrollment["status"],
+        "enrollment_date": enrollment["enrollment_date"].isoformat()
+    }
+
+def _plans_with_benefits(plans: list, benefit_rows: list) -> List[dict]:
+    """Plan row mappings as API dictionaries with their benefit texts attached"""
+    benefits_by_plan = {}
+    for plan_id, benefit_text in benefit_rows:
+        benefits_by_plan.setdefault(plan_id, []).append(benefit_text)
+    
+    result = []
+    for plan in plans:
+        plan_dict = plan._asdict()
+        plan_dict["benefits"] = benefits_by_plan.get(plan.id, [])
+        result.append(plan_dict)
+    return result
+
+def _validate_contribution(enrollment_data: EnrollmentRequest, plan) -> None:
+    """Raise ValueError if the contribution is outside the plan's limits"""
+    if (enrollment_data.monthly_contribution < plan.min_contribution or 
+        enrollment_data.monthly_contribution > plan.max_contribution):
+        raise ValueError(
+            f"Monthly contribution must be between ${plan.min_contribution} and ${plan.max_contribution}"
+        )
+
+def _build_enrollment_row(enrollment_data: EnrollmentRequest, enrollment_date: datetime) -> dict:
+    """Column values for a new enrollment; date and status are set client-side so no refresh is needed"""
+    return {
+        "plan_id": enrollment_data.selected_plan_id,
+        "full_name": enrollment_data.name,
+        "email": enrollment_data.email,
+        "email_normalized": normalize_email(enrollment_data.email),
+        "phone": enrollment_data.phone,
+        "monthly_contribution": int(enrollment_data.monthly_contribution),
+        "enrollment_date": enrollment_date,
+        "status": "pending"
+    }
+
+def _build_outbox_row(record: dict) -> dict:
+    """Column values for an enrollment replayed from the outbox"""
+    return {
+        "outbox_ref": record["outbox_ref"],
+        "plan_id": record["plan_id"],
+        "full_name": record["full_name"],
+        "email": record["email"],
+        "email_normalized": normalize_email(record["email"]),
+        "phone": record["phone"],
+        "monthly_contribution": int(record["monthly_contribution"]),
+        "enrollment_date": datetime.fromisoformat(record["enrollment_date"]),
+        "status": "pending"
+    }
+
+def insert_enrollment_rows(db: Session, rows: List[dict]) -> List[int]:
+    """
+    Insert enrollment rows in the current transaction and return their ids in order
+
+    Uses batched multi-row INSERT ... RETURNING where the dialect supports it
+    (SQLite, MariaDB), with ids in parameter order. MySQL has no
+    RETURNING, so the rows go in one multi-row INSERT: InnoDB assigns the
+    rows of a single simple INSERT consecutive auto-increment ids in VALUES
+    order (in every innodb_autoinc_lock_mode, with auto_increment_increment
+    at its default of 1), starting at the LAST_INSERT_ID() reported as
+    lastrowid. Callers insert in chunks, so the statement stays small.
+    The statistics counters are updated in the same transaction.
+    """
+    if not rows:
+        return []
+    
+    connection = db.connection()
+    enrollments = Enrollment.__table__
+    
+    if connection.dialect.name == "sqlite":
+        # SQLite has no implicit sentinel, so sort_by_parameter_order would fall back
+        # to one INSERT per row; its rowids follow VALUES order within each statement
+        # and the batches run sequentially, so sorting maps them back instead
+        statement = insert(enrollments).returning(enrollments.c.id)
+        ids = sorted(connection.execute(statement, rows).scalars())
+    elif connection.dialect.insert_executemany_returning:
+        statement = insert(enrollments).returning(enrollments.c.id, sort_by_parameter_order=True)
+        ids = list(connection.execute(statement, rows).scalars())
+    else:
+        first_id = connection.execute(insert(enrollments).values(rows)).lastrowid
+        ids = list(range(first_id, first_id + len(rows)))
+    
+    # Running statistics commit or roll back together with the rows
+    record_enrollment_rows(connection, rows)
+    return ids
+
+def encode_enrollment_cursor(enrollment_date: datetime, enrollment_id: int) -> str:
+    """Opaque cursor for the position after (enrollment_date, id)"""
+    position = json.dumps([enrollment_date.isoformat(), enrollment_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_enrollment_cursor(cursor: str) -> tuple:
+    """Inverse of encode_enrollment_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        enrollment_date, enrollment_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(enrollment_date), int(enrollment_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+class BatchInsertInterrupted(RuntimeError):
+    """
+    A database error other than a rejected row stopped a batch insert part way
+
+    `results` holds the outcome of every item already decided (validation
+    failures and committed chunks); `remaining` lists the indexes of the
+    valid items that were not written, for the caller's fallback. Raised
+    from the database error, so the circuit breaker counts connectivity
+    failures.
+    """
+
+    def __init__(self, results: List[Optional[dict]], remaining: List[int]):
+        super().__init__(f"Database error with {len(remaining)} batch items unwritten")
+        self.results = results
+        self.remaining = remaining
+
 class DatabaseService:
     """Service layer for database operations"""
     
     @staticmethod
     def get_all_financial_plans(db: Session) -> List[dict]:
-        """Get all active financial plans from database"""
+        """Get all active financial plans from database (two queries, no ORM hydration)"""
         try:
-            plans = db.query(FinancialPlan).filter(FinancialPlan.is_active == True).all()
+            plans = db.query(*_PLAN_COLUMNS).filter(
+                FinancialPlan.is_active == True
+            ).order_by(FinancialPlan.id).all()
             
-            result = []
-            for plan in plans:
-                # Get benefits for this plan
-                benefits = [benefit.benefit_text for benefit in plan.benefits]
-                
-                plan_dict = {
-                    "id": plan.id,
-                    "name": plan.name,
-                    "interest_rate": plan.interest_rate,
-                    "term": plan.term,
-                    "min_contribution": plan.min_contribution,
-                    "max_contribution": plan.max_contribution,
-                    "benefits": benefits,
-                    "description": plan.description
-                }
-                result.append(plan_dict)
+            if not plans:
+                return []
+            
+            # Load the benefits of every active plan in a single query
+            benefit_rows = db.query(PlanBenefit.plan_id, PlanBenefit.benefit_text).join(
+                FinancialPlan, PlanBenefit.plan_id == FinancialPlan.id
+            ).filter(
+                FinancialPlan.is_active == True
+            ).order_by(PlanBenefit.plan_id, PlanBenefit.id).all()
+            
+            result = _plans_with_benefits(plans, benefit_rows)
             
             logger.info(f"Retrieved {len(result)} financial plans from database")
             return result
@@ -44,55 +220,121 @@ class DatabaseService:
             raise
     
     @staticmethod
-    def create_enrollment(db: Session, enrollment_data: EnrollmentRequest) -> dict:
-        """Create a new enrollment in database"""
+    def search_financial_plans(
+        db: Session,
+        contribution: Optional[float] = None,
+        min_term_months: Optional[int] = None,
+        max_term_months: Optional[int] = None,
+        min_rate_bps: Optional[int] = None,
+        sort: str = "id",
+        limit: int = PLAN_SEARCH_DEFAULT_LIMIT,
+        offset: int = 0
+    ) -> dict:
+        """
+        One page of active plans matching the filters, sorted in SQL (two queries)
+        
+        contribution keeps plans whose min/max contribution range contains it.
+        sort is a PLAN_SORT_KEYS key, "-" prefixed for descending; ties are
+        broken by id. Raises ValueError for an unknown sort key.
+        """
+        descending = sort.startswith("-")
+        sort_key = sort[1:] if descending else sort
+        if sort_key not in PLAN_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        sort_column = getattr(FinancialPlan, PLAN_SORT_KEYS[sort_key])
+        
         try:
-            # Use the correct field name from the schema
-            plan_id = enrollment_data.selected_plan_id
+            query = db.query(*_PLAN_COLUMNS).filter(FinancialPlan.is_active == True)
+            if contribution is not None:
+                query = query.filter(
+                    FinancialPlan.min_contribution <= contribution,
+                    FinancialPlan.max_contribution >= contribution
+                )
+            if min_term_months is not None:
+                query = query.filter(FinancialPlan.term_months >= min_term_months)
+            if max_term_months is not None:
+                query = query.filter(FinancialPlan.term_months <= max_term_months)
+            if min_rate_bps is not None:
+                query = query.filter(FinancialPlan.interest_rate_bps >= min_rate_bps)
             
-            # Check if plan exists
-            plan = db.query(FinancialPlan).filter(
-                FinancialPlan.id == plan_id,
-                FinancialPlan.is_active == True
-            ).first()
+            # Plans whose rate or term could not be parsed (NULL) sort last in both directions
+            order = [sort_column.is_(None)] if sort_column.nullable else []
+            order.append(sort_column.desc() if descending else sort_column.asc())
+            if sort_key != "id":
+                order.append(FinancialPlan.id.asc())
             
-            if not plan:
-                raise ValueError(f"Plan with ID {plan_id} not found or inactive")
+            # One extra row tells whether another page exists
+            plans = query.order_by(*order).offset(offset).limit(limit + 1).all()
+            has_more = len(plans) > limit
+            plans = plans[:limit]
             
-            # Validate contribution amount
-            if (enrollment_data.monthly_contribution < plan.min_contribution or 
-                enrollment_data.monthly_contribution > plan.max_contribution):
-                raise ValueError(
-                    f"Monthly contribution must be between ${plan.min_contribution} and ${plan.max_contribution}"
-                )
+            benefit_rows = []
+            if plans:
+                benefit_rows = db.query(PlanBenefit.plan_id, PlanBenefit.benefit_text).filter(
+                    PlanBenefit.plan_id.in_([plan.id for plan in plans])
+                ).order_by(PlanBenefit.plan_id, PlanBenefit.id).all()
             
-            # Create enrollment
-            enrollment = Enrollment(
-                plan_id=plan_id,
-                full_name=enrollment_data.name,
-                email=enrollment_data.email,
-                phone=enrollment_data.phone,
-                monthly_contribution=int(enrollment_data.monthly_contribution),
-                status="pending"
-            )
+            return {"items": _plans_with_benefits(plans, benefit_rows), "has_more": has_more}
             
-            db.add(enrollment)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error searching financial plans: {str(e)}")
+            raise
+    
+    @staticmethod
+    def prepare_enrollment(db: Session, enrollment_data: EnrollmentRequest) -> tuple:
+        """Validate an enrollment against its plan and return (row, plan_name) ready to insert"""
+        # Use the correct field name from the schema
+        plan_id = enrollment_data.selected_plan_id
+        
+        # Active plans come from the shared catalog snapshot; no query unless it is stale
+        plan = plan_catalog.current(db).get(plan_id)
+        
+        if not plan:
+            raise ValueError(f"Plan with ID {plan_id} not found or inactive")
+        
+        # Validate contribution amount
+        _validate_contribution(enrollment_data, plan)
+        
+        return _build_enrollment_row(enrollment_data, datetime.now(timezone.utc)), plan.name
+    
+    @staticmethod
+    def insert_enrollments(db: Session, rows: List[dict]) -> List[int]:
+        """Insert prepared enrollment rows in one transaction and return their ids"""
+        try:
+            ids = insert_enrollment_rows(db, rows)
             db.commit()
-            db.refresh(enrollment)
+            return ids
+        except Exception:
+            db.rollback()
+            raise
+    
+    @staticmethod
+    def replay_outbox_records(db: Session, records: List[dict]) -> tuple:
+        """
+        Insert outbox records not already in the table; returns (inserted, duplicates)
+        
+        outbox_ref is unique, so a record replayed twice (a crash between
+        commit and deleting its segment) is skipped instead of duplicated.
+        """
+        refs = [record["outbox_ref"] for record in records]
+        existing = {ref for ref, in db.query(Enrollment.outbox_ref).filter(Enrollment.outbox_ref.in_(refs))}
+        rows = [_build_outbox_row(record) for record in records if record["outbox_ref"] not in existing]
+        
+        DatabaseService.insert_enrollments(db, rows)
+        return len(rows), len(records) - len(rows)
+    
+    @staticmethod
+    def create_enrollment(db: Session, enrollment_data: EnrollmentRequest) -> dict:
+        """Create a new enrollment in database (plan validated from the catalog snapshot, one INSERT)"""
+        try:
+            row, plan_name = DatabaseService.prepare_enrollment(db, enrollment_data)
             
-            logger.info(f"Created enrollment for {enrollment_data.email} in plan {plan_id}")
+            # Create enrollment
+            row["id"] = DatabaseService.insert_enrollments(db, [row])[0]
             
-            return {
-                "id": enrollment.id,
-                "plan_id": enrollment.plan_id,
-                "plan_name": plan.name,
-                "full_name": enrollment.full_name,
-                "email": enrollment.email,
-                "phone": enrollment.phone,
-                "monthly_contribution": enrollment.monthly_contribution,
-                "status": enrollment.status,
-                "enrollment_date": enrollment.enrollment_date.isoformat()
-            }
+            logger.info(f"Created enrollment for {enrollment_data.email} in plan {row['plan_id']}")
+            
+            return _enrollment_to_dict(row, plan_name)
             
         except ValueError as e:
             logger.warning(f"Validation error creating enrollment: {str(e)}")
@@ -106,26 +348,105 @@ class DatabaseService:
             logger.error(f"Unexpected error creating enrollment: {str(e)}")
             raise
     
+    @staticmethod
+    def create_enrollments_batch(
+        db: Session,
+        items: List[dict],
+        chunk_size: int = ENROLLMENT_BATCH_CHUNK_SIZE
+    ) -> List[dict]:
+        """
+        Validate and insert many enrollments against the plan catalog with chunked bulk inserts
+        
+        Returns one result per item, in request order: {"index", "success",
+        "enrollment_id", "message"}. A chunk the database rejects (integrity
+        or data error) is rolled back and retried row by row, so only the
+        offending items fail. Any other database error raises
+        BatchInsertInterrupted from it, so the circuit breaker sees
+        connectivity failures and the caller can fall back for the unwritten
+        items without repeating committed chunks.
+        """
+        plans = plan_catalog.current(db)
+        
+        results = [None] * len(items)
+        pending = []  # (index, row)
+        enrollment_date = datetime.now(timezone.utc)
+        
+        for index, item in enumerate(items):
+            try:
+                enrollment_data = EnrollmentRequest.model_validate(item)
+                plan = plans.get(enrollment_data.selected_plan_id)
+                if not plan:
+                    raise ValueError(f"Plan with ID {enrollment_data.selected_plan_id} not found or inactive")
+                _validate_contribution(enrollment_data, plan)
+            except ValidationError as e:
+                results[index] = {"index": index, "success": False, "enrollment_id": None,
+                                  "message": format_validation_error(e)}
+                continue
+            except ValueError as e:
+                results[index] = {"index": index, "success": False, "enrollment_id": None,
+                                  "message": str(e)}
+                continue
+            
+            pending.append((index, _build_enrollment_row(enrollment_data, enrollment_date)))
+        
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                ids = insert_enrollment_rows(db, [row for _, row in chunk])
+                db.commit()
+            except (IntegrityError, DataError) as e:
+                db.rollback()
+                # Some row was rejected; insert the chunk row by row to fail only that item
+                logger.warning(f"Enrollment batch chunk rejected, retrying rows individually: {str(e)}")
+                for offset in range(len(chunk)):
+                    DatabaseService._insert_batch_row(db, results, pending, start + offset)
+                continue
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise BatchInsertInterrupted(results, [index for index, _ in pending[start:]]) from e
+            
+            for (index, _), enrollment_id in zip(chunk, ids):
+                results[index] = {"index": index, "success": True,
+                                  "enrollment_id": str(enrollment_id), "message": "Enrollment created"}
+        
+        logger.info(f"Batch enrollment: {len(pending)} of {len(items)} items passed validation")
+        return results
+    
+    @staticmethod
+    def _insert_batch_row(db: Session, results: List[Optional[dict]], pending: List[tuple], position: int):
+        """Insert pending[position] in its own transaction; only integrity and data errors fail the item"""
+        index, row = pending[position]
+        try:
+            enrollment_id = insert_enrollment_rows(db, [row])[0]
+            db.commit()
+        except (IntegrityError, DataError) as e:
+            db.rollback()
+            logger.warning(f"Batch item {index} rejected by the database: {str(e)}")
+            results[index] = {"index": index, "success": False, "enrollment_id": None,
+                              "message": "Rejected by the database (constraint or data error)"}
+            return
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise BatchInsertInterrupted(results, [index for index, _ in pending[position:]]) from e
+        
+        results[index] = {"index": index, "success": True,
+                          "enrollment_id": str(enrollment_id), "message": "Enrollment created"}
+    
     @staticmethod
     def get_enrollment_by_id(db: Session, enrollment_id: int) -> Optional[dict]:
-        """Get enrollment by ID"""
+        """Get enrollment by ID (single joined projection)"""
         try:
-            enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+            enrollment = db.query(
+                *_ENROLLMENT_COLUMNS,
+                FinancialPlan.name.label("plan_name")
+            ).join(
+                FinancialPlan, Enrollment.plan_id == FinancialPlan.id
+            ).filter(Enrollment.id == enrollment_id).first()
             
             if not enrollment:
                 return None
             
-            return {
-                "id": enrollment.id,
-                "plan_id": enrollment.plan_id,
-                "plan_name": enrollment.plan.name,
-                "full_name": enrollment.full_name,
-                "email": enrollment.email,
-                "phone": enrollment.phone,
-                "monthly_contribution": enrollment.monthly_contribution,
-                "status": enrollment.status,
-                "enrollment_date": enrollment.enrollment_date.isoformat()
-            }
+            return _enrollment_to_dict(enrollment._mapping, enrollment.plan_name)
             
         except SQLAlchemyError as e:
             logger.error(f"Database error retrieving enrollment {enrollment_id}: {str(e)}")
@@ -134,13 +455,102 @@ class DatabaseService:
             logger.error(f"Unexpected error retrieving enrollment {enrollment_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def list_enrollments(
+        db: Session,
+        limit: int = ENROLLMENT_PAGE_DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        plan_id: Optional[int] = None,
+        status: Optional[str] = None,
+        email: Optional[str] = None
+    ) -> dict:
+        """
+        One page of enrollments, newest first, using keyset pagination on (enrollment_date, id)
+        
+        Filtering by email matches the normalized address, so case variants
+        find each other through the (email_normalized, enrollment_date, id) index.
+        
+        The cursor encodes the last row of the previous page, so every page is a
+        single indexed range scan regardless of how deep the client has paged.
+        Fetches limit + 1 rows to know whether another page exists.
+        """
+        try:
+            query = db.query(
+                *_ENROLLMENT_COLUMNS,
+                FinancialPlan.name.label("plan_name")
+            ).join(
+                FinancialPlan, Enrollment.plan_id == FinancialPlan.id
+            )
+            
+            if plan_id is not None:
+                query = query.filter(Enrollment.plan_id == plan_id)
+            if status is not None:
+                query = query.filter(Enrollment.status == status)
+            if email is not None:
+                query = query.filter(Enrollment.email_normalized == normalize_email(email))
+            if cursor:
+                after_date, after_id = decode_enrollment_cursor(cursor)
+                query = query.filter(or_(
+                    Enrollment.enrollment_date < after_date,
+                    and_(Enrollment.enrollment_date == after_date, Enrollment.id < after_id)
+                ))
+            
+            rows = query.order_by(
+                Enrollment.enrollment_date.desc(),
+                Enrollment.id.desc()
+            ).limit(limit + 1).all()
+            
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_enrollment_cursor(rows[-1].enrollment_date, rows[-1].id)
+            
+            return {
+                "items": [_enrollment_to_dict(row._mapping, row.plan_name) for row in rows],
+                "next_cursor": next_cursor,
+                "has_more": has_more
+            }
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error listing enrollments: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_enrollments_by_email(
+        db: Session,
+        email: str,
+        limit: int = ENROLLMENT_PAGE_DEFAULT_LIMIT,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """One page of an address's enrollments plus its total count (primary-key lookup)"""
+        page = DatabaseService.list_enrollments(db, limit, cursor, email=email)
+        try:
+            total = db.query(EnrollmentEmailCount.enrollment_count).filter(
+                EnrollmentEmailCount.email == normalize_email(email)
+            ).scalar()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error counting enrollments by email: {str(e)}")
+            raise
+        page["total"] = total or 0
+        return page
+    
+    @staticmethod
+    def get_enrollment_statistics(db: Session) -> dict:
+        """Enrollment statistics read from the incrementally maintained counters"""
+        try:
+            return read_enrollment_statistics(db)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error reading enrollment statistics: {str(e)}")
+            raise
+    
     @staticmethod
     def seed_initial_data(db: Session):
         """Seed initial financial plans data"""
         try:
             # Check if data already exists
-            existing_plans = db.query(FinancialPlan).count()
-            if existing_plans > 0:
+            existing_plan = db.query(FinancialPlan.id).limit(1).first()
+            if existing_plan is not None:
                 logger.info("Financial plans already exist, skipping seed data")
                 return
             
@@ -204,19 +614,13 @@ class DatabaseService:
                 }
             ]
             
-            # Create plans and benefits
+            # Create plans and benefits; a single flush batches the inserts
             for plan_data in plans_data:
                 benefits = plan_data.pop("benefits")
                 
-                # Create plan
                 plan = FinancialPlan(**plan_data)
+                plan.benefits = [PlanBenefit(benefit_text=benefit_text) for benefit_text in benefits]
                 db.add(plan)
-                db.flush()  # Get the ID
-                
-                # Create benefits
-                for benefit_text in benefits:
-                    benefit = PlanBenefit(plan_id=plan.id, benefit_text=benefit_text)
-                    db.add(benefit)
             
             db.commit()
             logger.info("Successfully seeded initial financial plans data")
@@ -229,3 +633,169 @@ class DatabaseService:
             db.rollback()
             logger.error(f"Unexpected error seeding initial data: {str(e)}")
             raise
+
+def _circuit_for(db: AsyncSession):
+    """The circuit breaker guarding calls on `db`: its replica's, or the primary's"""
+    replica = database.replica_set.replica_for(db)
+    return replica.circuit_breaker if replica is not None else database_circuit_breaker
+
+async def _run_read(db: AsyncSession, call, *args):
+    """
+    Run a read-only DatabaseService call on `db`
+
+    Calls on a replica go through the replica's own circuit. If the replica
+    is unreachable (or its circuit is open) the call is retried on the
+    primary, so replica outages neither reach the fallbacks nor open the
+    primary's circuit.
+    """
+    replica = database.replica_set.replica_for(db)
+    if replica is not None:
+        try:
+            async with replica.circuit_breaker.guard():
+                return await db.run_sync(call, *args)
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError) and not is_database_failure(e):
+                raise
+            logger.warning(f"Read replica {replica.name} failed, reading from the primary: {str(e)}")
+        
+        async with database.primary_session() as primary_db:
+            async with database_circuit_breaker.guard():
+                return await primary_db.run_sync(call, *args)
+    
+    async with database_circuit_breaker.guard():
+        return await db.run_sync(call, *args)
+
+class AsyncDatabaseService:
+    """
+    Async counterparts of DatabaseService for route handlers
+
+    Each call runs the synchronous implementation through AsyncSession.run_sync,
+    so the queries are identical but I/O goes through the async driver and
+    never blocks the event loop. Every call goes through the database circuit
+    breaker, which raises CircuitOpenError during outages so callers fall
+    back immediately. Read-only calls accept replica sessions (see _run_read).
+    """
+    
+    @staticmethod
+    async def get_all_financial_plans(db: AsyncSession) -> List[dict]:
+        """Get all active financial plans from database"""
+        return await _run_read(db, DatabaseService.get_all_financial_plans)
+    
+    @staticmethod
+    async def search_financial_plans(
+        db: AsyncSession,
+        contribution: Optional[float] = None,
+        min_term_months: Optional[int] = None,
+        max_term_months: Optional[int] = None,
+        min_rate_bps: Optional[int] = None,
+        sort: str = "id",
+        limit: int = PLAN_SEARCH_DEFAULT_LIMIT,
+        offset: int = 0
+    ) -> dict:
+        """One page of active plans matching the filters"""
+        return await _run_read(
+            db, DatabaseService.search_financial_plans,
+            contribution, min_term_months, max_term_months, min_rate_bps, sort, limit, offset
+        )
+    
+    @staticmethod
+    async def create_enrollment(db: AsyncSession, enrollment_data: EnrollmentRequest) -> dict:
+        """Create a new enrollment in database, through the group committer when enabled"""
+        async with database_circuit_breaker.guard():
+            if not ENROLLMENT_GROUP_COMMIT:
+                return await db.run_sync(DatabaseService.create_enrollment, enrollment_data)
+            
+            try:
+                row, plan_name = await db.run_sync(DatabaseService.prepare_enrollment, enrollment_data)
+            except ValueError as e:
+                logger.warning(f"Validation error creating enrollment: {str(e)}")
+                raise
+            finally:
+                # Release the pooled connection before waiting for the shared commit
+                await db.rollback()
+            
+            row["id"] = await enrollment_group_committer.submit(row)
+        
+        logger.info(f"Created enrollment for {enrollment_data.email} in plan {row['plan_id']}")
+        return _enrollment_to_dict(row, plan_name)
+    
+    @staticmethod
+    async def create_enrollments_batch(db: AsyncSession, items: List[dict]) -> List[dict]:
+        """Validate and bulk insert many enrollments"""
+        async with database_circuit_breaker.guard():
+            return await db.run_sync(DatabaseService.create_enrollments_batch, items)
+    
+    @staticmethod
+    async def get_enrollment_by_id(db: AsyncSession, enrollment_id: int) -> Optional[dict]:
+        """Get enrollment by ID"""
+        return await _run_read(db, DatabaseService.get_enrollment_by_id, enrollment_id)
+    
+    @staticmethod
+    async def list_enrollments(
+        db: AsyncSession,
+        limit: int = ENROLLMENT_PAGE_DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        plan_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> dict:
+        """One page of enrollments, newest first"""
+        return await _run_read(db, DatabaseService.list_enrollments, limit, cursor, plan_id, status)
+    
+    @staticmethod
+    async def get_enrollments_by_email(
+        db: AsyncSession,
+        email: str,
+        limit: int = ENROLLMENT_PAGE_DEFAULT_LIMIT,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """One page of an address's enrollments plus its total count"""
+        return await _run_read(db, DatabaseService.get_enrollments_by_email, email, limit, cursor)
+    
+    @staticmethod
+    async def get_enrollment_statistics(db: AsyncSession) -> dict:
+        """Enrollment statistics read from the incrementally maintained counters"""
+        return await _run_read(db, DatabaseService.get_enrollment_statistics)
+    
+    @staticmethod
+    async def stream_enrollments(
+        db: AsyncSession,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        chunk_size: int = ENROLLMENT_EXPORT_CHUNK_SIZE
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Yield enrollments oldest first in chunks of `chunk_size` from a server-side cursor
+        
+        Only one chunk is held in memory at a time, so exporting the whole table
+        costs the same memory as exporting one page.
+        """
+        statement = select(
+            *_ENROLLMENT_COLUMNS,
+            FinancialPlan.name.label("plan_name")
+        ).join(
+            FinancialPlan, Enrollment.plan_id == FinancialPlan.id
+        )
+        
+        if date_from is not None:
+            statement = statement.where(Enrollment.enrollment_date >= date_from)
+        if date_to is not None:
+            statement = statement.where(Enrollment.enrollment_date < date_to)
+        
+        statement = statement.order_by(
+            Enrollment.enrollment_date,
+            Enrollment.id
+        ).execution_options(yield_per=chunk_size)
+        
+        async with _circuit_for(db).guard():
+            result = await db.stream(statement)
+        try:
+            async for partition in result.partitions():
+                yield [_enrollment_to_dict(row._mapping, row.plan_name) for row in partition]
+        finally:
+            await result.close()
+    
+    @staticmethod
+    async def seed_initial_data(db: AsyncSession):
+        """Seed initial financial plans data"""
+        async with database_circuit_breaker.guard():
+            return await db.run_sync(DatabaseService.seed_initial_data)
@@ -1,54 +1,99 @@
 import uuid
-from datetime import datetime
-from typing import Dict, List
-from app.models.schemas import EnrollmentRequest, EnrollmentResponse, FinancialPlan
-from app.data.financial_plans import get_plan_by_id
+from datetime import datetime, timezone
+from collections import Counter
+from typing import Dict, List, Optional
+from pydantic import ValidationError
+from app.models.schemas import EnrollmentRequest, EnrollmentResponse, FinancialPlan, format_validation_error, normalize_email
+from app.services.outbox import OutboxFullError, enrollment_outbox
+from app.services.plan_catalog import CatalogPlan, plan_catalog
 
-# In-memory storage for enrollments (will be replaced with database later)
-enrollments_storage: Dict[str, dict] = {}
+# Enrollments this worker accepted while the database was down. They are durable
+# in the outbox; this view serves fallback reads until the replayer inserts them.
+pending_enrollments: Dict[str, dict] = {}
+
+# Secondary index: normalized email -> enrollment ids, oldest first
+_enrollment_ids_by_email: Dict[str, List[str]] = {}
+
+# Running statistics, updated as each enrollment is stored instead of rescanning
+_plan_counts: Counter = Counter()
+_status_counts: Counter = Counter()
+_email_counts: Counter = Counter()
+_multiple_emails: Dict[str, int] = {}
+
+def _index_enrollment(enrollment_record: dict):
+    email = normalize_email(enrollment_record['email'])
+    _enrollment_ids_by_email.setdefault(email, []).append(enrollment_record['enrollment_id'])
+
+def _record_statistics(enrollment_record: dict, delta: int = 1):
+    email = normalize_email(enrollment_record['email'])
+    _plan_counts[enrollment_record['selected_plan']['name']] += delta
+    _status_counts[enrollment_record['status']] += delta
+    _email_counts[email] += delta
+    if _email_counts[email] > 1:
+        _multiple_emails[email] = _email_counts[email]
+    else:
+        _multiple_emails.pop(email, None)
+    # Drop exhausted keys so the counters only describe pending enrollments
+    for counter, key in ((_plan_counts, enrollment_record['selected_plan']['name']),
+                         (_status_counts, enrollment_record['status']),
+                         (_email_counts, email)):
+        if counter[key] <= 0:
+            del counter[key]
+
+def _forget(enrollment_ids: List[str]):
+    """Drop enrollments from the pending view (replayed by the outbox, or never appended)"""
+    for enrollment_id in enrollment_ids:
+        enrollment_record = pending_enrollments.pop(enrollment_id, None)
+        if enrollment_record is None:
+            continue  # replayed from another worker's segment
+        
+        email = normalize_email(enrollment_record['email'])
+        enrollment_ids = _enrollment_ids_by_email.get(email, [])
+        if enrollment_id in enrollment_ids:
+            enrollment_ids.remove(enrollment_id)
+        if not enrollment_ids:
+            _enrollment_ids_by_email.pop(email, None)
+        _record_statistics(enrollment_record, delta=-1)
+
+# Once replayed, the database serves these enrollments
+enrollment_outbox.add_replay_listener(_forget)
 
 class EnrollmentService:
     
     @staticmethod
-    def validate_enrollment(enrollment_data: EnrollmentRequest) -> tuple[bool, str]:
-        """Validate enrollment data against business rules"""
+    def _check_enrollment(enrollment_data: EnrollmentRequest) -> tuple:
+        """Return (plan, message); plan is None when the enrollment breaks a business rule"""
         
-        # Get the selected plan
-        selected_plan = get_plan_by_id(enrollment_data.selected_plan_id)
+        # Get the selected plan from the shared catalog snapshot (one dict lookup)
+        selected_plan = plan_catalog.latest.get(enrollment_data.selected_plan_id)
         if not selected_plan:
-            return False, f"Invalid plan ID: {enrollment_data.selected_plan_id}"
+            return None, f"Invalid plan ID: {enrollment_data.selected_plan_id}"
         
         # Validate contribution amount
         if enrollment_data.monthly_contribution < selected_plan.min_contribution:
-            return False, f"Monthly contribution must be at least ${selected_plan.min_contribution}"
+            return None, f"Monthly contribution must be at least ${selected_plan.min_contribution}"
         
         if enrollment_data.monthly_contribution > selected_plan.max_contribution:
-            return False, f"Monthly contribution cannot exceed ${selected_plan.max_contribution}"
+            return None, f"Monthly contribution cannot exceed ${selected_plan.max_contribution}"
         
         # REMOVED: Email uniqueness check - now allowing duplicate emails
         # This allows the same person to enroll in multiple plans or 
         # create multiple enrollments as needed
         
-        return True, "Validation successful"
+        return selected_plan, "Validation successful"
     
     @staticmethod
-    def create_enrollment(enrollment_data: EnrollmentRequest) -> EnrollmentResponse:
-        """Create a new enrollment"""
-        
-        # Validate the enrollment
-        is_valid, validation_message = EnrollmentService.validate_enrollment(enrollment_data)
-        if not is_valid:
-            return EnrollmentResponse(
-                success=False,
-                message=validation_message,
-                enrollment_id=""
-            )
-        
-        # Generate unique enrollment ID
+    def validate_enrollment(enrollment_data: EnrollmentRequest) -> tuple[bool, str]:
+        """Validate enrollment data against business rules"""
+        selected_plan, message = EnrollmentService._check_enrollment(enrollment_data)
+        return selected_plan is not None, message
+    
+    @staticmethod
+    def _build_records(enrollment_data: EnrollmentRequest, selected_plan: CatalogPlan) -> tuple:
+        """The API record of an accepted enrollment and its compact outbox record"""
+        # Generate unique enrollment ID (also the outbox_ref that deduplicates replays)
         enrollment_id = str(uuid.uuid4())
-        
-        # Get the selected plan details
-        selected_plan = get_plan_by_id(enrollment_data.selected_plan_id)
+        enrollment_date = datetime.now(timezone.utc).isoformat()
         
         # Create enrollment record
         enrollment_record = {
@@ -64,64 +109,153 @@ class EnrollmentService:
                 "term": selected_plan.term
             },
             "monthly_contribution": enrollment_data.monthly_contribution,
-            "enrollment_date": datetime.now().isoformat(),
+            "enrollment_date": enrollment_date,
             "status": "active"
         }
         
-        # Store in memory (will be database later)
-        enrollments_storage[enrollment_id] = enrollment_record
+        outbox_record = {
+            "outbox_ref": enrollment_id,
+            "plan_id": selected_plan.id,
+            "full_name": enrollment_data.name,
+            "email": enrollment_data.email,
+            "phone": enrollment_data.phone,
+            "monthly_contribution": enrollment_data.monthly_contribution,
+            "enrollment_date": enrollment_date
+        }
+        return enrollment_record, outbox_record
+    
+    @staticmethod
+    def _store(enrollment_record: dict):
+        pending_enrollments[enrollment_record['enrollment_id']] = enrollment_record
+        _index_enrollment(enrollment_record)
+        _record_statistics(enrollment_record)
+    
+    @staticmethod
+    async def create_enrollment(enrollment_data: EnrollmentRequest) -> EnrollmentResponse:
+        """
+        Accept a new enrollment into the durable outbox
+        
+        Raises OutboxFullError when the outbox is at capacity.
+        """
+        
+        # Validate the enrollment
+        selected_plan, validation_message = EnrollmentService._check_enrollment(enrollment_data)
+        if not selected_plan:
+            return EnrollmentResponse(
+                success=False,
+                message=validation_message,
+                enrollment_id=""
+            )
+        
+        enrollment_record, outbox_record = EnrollmentService._build_records(enrollment_data, selected_plan)
+        
+        # Registered before the append so a replay finishing right after the fsync can't miss it;
+        # the request is acknowledged only once the record is fsynced
+        EnrollmentService._store(enrollment_record)
+        try:
+            await enrollment_outbox.append([outbox_record])
+        except Exception:
+            _forget([enrollment_record["enrollment_id"]])
+            raise
         
         return EnrollmentResponse(
             success=True,
             message="Enrollment completed successfully",
-            enrollment_id=enrollment_id,
+            enrollment_id=enrollment_record["enrollment_id"],
             enrollment_data=enrollment_record
         )
     
+    @staticmethod
+    async def create_enrollments_batch(items: List[dict]) -> List[dict]:
+        """Accept many enrollments with one outbox append, returning one result per item in request order"""
+        results = [None] * len(items)
+        accepted = []  # (index, enrollment_record, outbox_record)
+        
+        for index, item in enumerate(items):
+            try:
+                enrollment_data = EnrollmentRequest.model_validate(item)
+            except ValidationError as e:
+                results[index] = {"index": index, "success": False, "enrollment_id": None,
+                                  "message": format_validation_error(e)}
+                continue
+            
+            selected_plan, validation_message = EnrollmentService._check_enrollment(enrollment_data)
+            if not selected_plan:
+                results[index] = {"index": index, "success": False, "enrollment_id": None,
+                                  "message": validation_message}
+                continue
+            
+            accepted.append((index, *EnrollmentService._build_records(enrollment_data, selected_plan)))
+        
+        for _, enrollment_record, _ in accepted:
+            EnrollmentService._store(enrollment_record)
+        
+        try:
+            if accepted:
+                await enrollment_outbox.append([outbox_record for _, _, outbox_record in accepted])
+        except Exception as e:
+            _forget([enrollment_record["enrollment_id"] for _, enrollment_record, _ in accepted])
+            if not isinstance(e, OutboxFullError):
+                raise
+            for index, _, _ in accepted:
+                results[index] = {"index": index, "success": False, "enrollment_id": None, "message": str(e)}
+            return results
+        
+        for index, enrollment_record, _ in accepted:
+            results[index] = {
+                "index": index,
+                "success": True,
+                "enrollment_id": enrollment_record["enrollment_id"],
+                "message": "Enrollment completed successfully"
+            }
+        
+        return results
+    
     @staticmethod
     def get_enrollment(enrollment_id: str) -> dict:
         """Get enrollment by ID"""
-        return enrollments_storage.get(enrollment_id)
+        return pending_enrollments.get(enrollment_id)
     
     @staticmethod
     def get_all_enrollments() -> List[dict]:
         """Get all enrollments (for admin purposes)"""
-        return list(enrollments_storage.values())
+        return list(pending_enrollments.values())
+    
+    @staticmethod
+    def list_enrollments(limit: int, plan_id: Optional[int] = None, status: Optional[str] = None) -> dict:
+        """Newest enrollments first, in the same page shape as the database listing (no cursor)"""
+        enrollments = [
+            enrollment for enrollment in reversed(list(pending_enrollments.values()))
+            if (plan_id is None or enrollment['selected_plan']['id'] == plan_id)
+            and (status is None or enrollment['status'] == status)
+        ]
+        return {"items": enrollments[:limit], "next_cursor": None, "has_more": False}
     
     @staticmethod
     def get_enrollments_count() -> int:
         """Get total number of enrollments"""
-        return len(enrollments_storage)
+        return len(pending_enrollments)
     
     @staticmethod
-    def get_enrollments_by_email(email: str) -> List[dict]:
-        """Get all enrollments for a specific email address"""
-        return [enrollment for enrollment in enrollments_storage.values() 
-                if enrollment.get('email') == email]
+    def get_enrollments_by_email(email: str, limit: Optional[int] = None) -> List[dict]:
+        """Get enrollments for an email address (any case), newest first, via the email index"""
+        enrollment_ids = _enrollment_ids_by_email.get(normalize_email(email), [])
+        newest_first = reversed(enrollment_ids[-limit:] if limit else enrollment_ids)
+        return [pending_enrollments[enrollment_id] for enrollment_id in newest_first]
+    
+    @staticmethod
+    def count_enrollments_by_email(email: str) -> int:
+        """Number of enrollments for an email address (any case)"""
+        return len(_enrollment_ids_by_email.get(normalize_email(email), []))
     
     @staticmethod
     def get_enrollment_statistics() -> dict:
-        """Get enrollment statistics"""
-        enrollments = list(enrollments_storage.values())
-        
-        # Count enrollments by plan
-        plan_counts = {}
-        email_counts = {}
-        
-        for enrollment in enrollments:
-            plan_name = enrollment['selected_plan']['name']
-            email = enrollment['email']
-            
-            plan_counts[plan_name] = plan_counts.get(plan_name, 0) + 1
-            email_counts[email] = email_counts.get(email, 0) + 1
-        
-        # Find emails with multiple enrollments
-        duplicate_emails = {email: count for email, count in email_counts.items() if count > 1}
-        
+        """Get enrollment statistics from the running counters"""
         return {
-            "total_enrollments": len(enrollments),
-            "unique_emails": len(email_counts),
-            "duplicate_emails": len(duplicate_emails),
-            "enrollments_by_plan": plan_counts,
-            "emails_with_multiple_enrollments": duplicate_emails
+            "total_enrollments": len(pending_enrollments),
+            "unique_emails": len(_email_counts),
+            "duplicate_emails": len(_multiple_emails),
+            "enrollments_by_plan": dict(_plan_counts),
+            "enrollments_by_status": dict(_status_counts),
+            "emails_with_multiple_enrollments": dict(_multiple_emails)
         }
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from app import database
+from app.services.circuit_breaker import CircuitOpenError, is_database_failure
+from app.services.database_service import AsyncDatabaseService, ENROLLMENT_EXPORT_CHUNK_SIZE
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column order of the CSV export (NDJSON objects carry the same keys)
+EXPORT_FIELDS = (
+    "id", "plan_id", "plan_name", "full_name", "email", "phone",
+    "monthly_contribution", "status", "enrollment_date"
+)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def format_ndjson(rows: List[dict]) -> str:
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+def format_csv(rows: List[dict], include_header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    if include_header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def export_filename(export_format: str, compress: bool) -> str:
+    return f"enrollments.{export_format}" + (".gz" if compress else "")
+
+async def _enrollment_chunks(
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    chunk_size: int
+) -> AsyncIterator[List[dict]]:
+    """Enrollment chunks from a read session; restarted on the primary if a replica fails before the first chunk"""
+    async with database.replica_set.session() as db:
+        started = False
+        try:
+            async for rows in AsyncDatabaseService.stream_enrollments(db, date_from, date_to, chunk_size):
+                started = True
+                yield rows
+            return
+        except Exception as e:
+            replica_failed = isinstance(e, CircuitOpenError) or is_database_failure(e)
+            if started or not replica_failed or database.replica_set.replica_for(db) is None:
+                raise
+            logger.warning(f"Read replica failed, exporting from the primary: {str(e)}")
+
+    async with database.primary_session() as db:
+        async for rows in AsyncDatabaseService.stream_enrollments(db, date_from, date_to, chunk_size):
+            yield rows
+
+async def export_enrollments(
+    export_format: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    compress: bool = False,
+    chunk_size: int = ENROLLMENT_EXPORT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Stream enrollments as NDJSON or CSV bytes, optionally gzip-compressed
+
+    The generator opens its own session because it outlives the request
+    handler; the session and its cursor are released when the stream ends
+    or the client disconnects. Exports read from a replica when one is
+    configured.
+    """
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    exported = 0
+    chunks = _enrollment_chunks(date_from, date_to, chunk_size)
+    try:
+        async for rows in chunks:
+            if export_format == "ndjson":
+                text = format_ndjson(rows)
+            else:
+                text = format_csv(rows, include_header=exported == 0)
+            exported += len(rows)
+            chunk = encode(text)
+            if chunk:
+                yield chunk
+    finally:
+        # Releases the session and cursor promptly when the client disconnects
+        await chunks.aclose()
+
+    tail = encode(format_csv([], include_header=True)) if export_format == "csv" and exported == 0 else b""
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
+
+    logger.info(f"Exported {exported} enrollments as {export_format}{' (gzip)' if compress else ''}")
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import time
+from typing import List, Optional
+from app import database
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: merge concurrent enrollment inserts into shared transactions
+ENROLLMENT_GROUP_COMMIT = os.getenv("ENROLLMENT_GROUP_COMMIT", "false").lower() == "true"
+# How long the first row of a group waits for company, and the most rows per transaction
+ENROLLMENT_GROUP_COMMIT_WINDOW_MS = float(os.getenv("ENROLLMENT_GROUP_COMMIT_WINDOW_MS", "5"))
+ENROLLMENT_GROUP_COMMIT_MAX_ROWS = int(os.getenv("ENROLLMENT_GROUP_COMMIT_MAX_ROWS", "100"))
+
+class GroupCommitStats:
+    """Counters describing group sizes, time spent in the window and commit latency"""
+
+    def __init__(self):
+        self.groups_total = 0
+        self.rows_total = 0
+        self.failed_groups_total = 0
+        self.last_group_size = 0
+        self.max_group_size = 0
+        self.window_wait_ms_total = 0.0
+        self.commit_latency_ms_total = 0.0
+        self.commit_latency_ms_last = 0.0
+        self.commit_latency_ms_max = 0.0
+
+    def record(self, size: int, window_wait_ms: float, commit_latency_ms: float, failed: bool):
+        self.groups_total += 1
+        self.rows_total += size
+        self.failed_groups_total += int(failed)
+        self.last_group_size = size
+        self.max_group_size = max(self.max_group_size, size)
+        self.window_wait_ms_total += window_wait_ms
+        self.commit_latency_ms_total += commit_latency_ms
+        self.commit_latency_ms_last = commit_latency_ms
+        self.commit_latency_ms_max = max(self.commit_latency_ms_max, commit_latency_ms)
+
+    def snapshot(self) -> dict:
+        groups = self.groups_total or 1
+        return {
+            "groups_total": self.groups_total,
+            "rows_total": self.rows_total,
+            "failed_groups_total": self.failed_groups_total,
+            "avg_group_size": round(self.rows_total / groups, 2),
+            "last_group_size": self.last_group_size,
+            "max_group_size": self.max_group_size,
+            "avg_window_wait_ms": round(self.window_wait_ms_total / groups, 3),
+            "avg_commit_latency_ms": round(self.commit_latency_ms_total / groups, 3),
+            "last_commit_latency_ms": round(self.commit_latency_ms_last, 3),
+            "max_commit_latency_ms": round(self.commit_latency_ms_max, 3)
+        }
+
+class EnrollmentGroupCommitter:
+    """
+    Merges enrollment inserts that arrive within a short window into one transaction
+
+    The first row of a group opens a window of `window_ms`; the group is
+    committed when the window closes or `max_rows` rows have queued. Every
+    caller still gets its own id. If the shared transaction fails, its rows
+    are retried one by one so each caller sees only its own error.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = ENROLLMENT_GROUP_COMMIT_WINDOW_MS,
+        max_rows: int = ENROLLMENT_GROUP_COMMIT_MAX_ROWS
+    ):
+        self.window_ms = window_ms
+        self.max_rows = max_rows
+        self.stats = GroupCommitStats()
+        self._pending: List[tuple] = []  # (row, future)
+        self._window_opened_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._commit_tasks = set()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, row: dict) -> int:
+        """Queue a prepared enrollment row and wait for the id of its committed insert"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if not self._pending:
+            self._window_opened_at = time.perf_counter()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_rows:
+            self._close_window()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._close_window)
+
+        return await future
+
+    def _close_window(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        group, self._pending = self._pending, []
+        if not group:
+            return
+
+        window_wait_ms = (time.perf_counter() - self._window_opened_at) * 1000
+        task = asyncio.create_task(self._commit_group(group, window_wait_ms))
+        self._commit_tasks.add(task)
+        task.add_done_callback(self._commit_tasks.discard)
+
+    @staticmethod
+    async def _insert(rows: List[dict]) -> List[int]:
+        from app.services.database_service import DatabaseService
+
+        if database.AsyncSessionLocal is None:
+            database.create_async_session_factory()
+
+        async with database.AsyncSessionLocal() as db:
+            return await db.run_sync(DatabaseService.insert_enrollments, rows)
+
+    async def _commit_group(self, group: List[tuple], window_wait_ms: float):
+        started = time.perf_counter()
+        failed = False
+
+        try:
+            ids = await self._insert([row for row, _ in group])
+            for (_, future), enrollment_id in zip(group, ids):
+                if not future.done():
+                    future.set_result(enrollment_id)
+        except Exception as e:
+            failed = True
+            logger.error(f"Group commit of {len(group)} enrollments failed: {str(e)}")
+            await self._commit_individually(group, e)
+        finally:
+            self.stats.record(len(group), window_wait_ms, (time.perf_counter() - started) * 1000, failed)
+
+    async def _commit_individually(self, group: List[tuple], group_error: Exception):
+        """Isolate a failed group so each caller gets its own result"""
+        if len(group) == 1:
+            _, future = group[0]
+            if not future.done():
+                future.set_exception(group_error)
+            return
+
+        for row, future in group:
+            try:
+                enrollment_id = (await self._insert([row]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(enrollment_id)
+
+    async def drain(self):
+        """Commit anything queued and wait for in-flight groups (shutdown)"""
+        self._close_window()
+        if self._commit_tasks:
+            await asyncio.gather(*self._commit_tasks, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        """Configuration, queue depth and group commit statistics"""
+        return {
+            "enabled": ENROLLMENT_GROUP_COMMIT,
+            "window_ms": self.window_ms,
+            "max_rows": self.max_rows,
+            "queue_depth": self.queue_depth,
+            **self.stats.snapshot()
+        }
+
+enrollment_group_committer = EnrollmentGroupCommitter()
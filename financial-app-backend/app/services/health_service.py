@@ -0,0 +1,178 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import text
+from app import database
+import logging
+
+logger = logging.getLogger(__name__)
+
+DB_HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("DB_HEALTH_PROBE_INTERVAL_SECONDS", "5"))
+DB_HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("DB_HEALTH_PROBE_TIMEOUT_SECONDS", "2"))
+# Number of recent probe latencies kept for percentiles
+DB_HEALTH_LATENCY_WINDOW = int(os.getenv("DB_HEALTH_LATENCY_WINDOW", "120"))
+
+def _percentile(sorted_values: list, fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class DatabaseHealthProber:
+    """
+    Periodically probes the database in the background and keeps the last-known state
+
+    Health endpoints read the precomputed snapshot instead of checking out a
+    pool connection per request.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = DB_HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout_seconds: float = DB_HEALTH_PROBE_TIMEOUT_SECONDS,
+        latency_window: int = DB_HEALTH_LATENCY_WINDOW
+    ):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._latencies_ms = deque(maxlen=latency_window)
+        self._task: Optional[asyncio.Task] = None
+        self._checked_at_monotonic: Optional[float] = None
+        self._ready = False
+        self._state = {
+            "healthy": False,
+            "last_checked_at": None,
+            "last_success_at": None,
+            "last_error": None,
+            "consecutive_failures": 0,
+            "latency_ms": {"last": None, "p50": None, "p95": None, "p99": None}
+        }
+
+    @property
+    def healthy(self) -> bool:
+        """Last probe succeeded and is not stale"""
+        return self._state["healthy"] and not self._is_stale()
+
+    @property
+    def ready(self) -> bool:
+        """True once any probe has succeeded (readiness for traffic)"""
+        return self._ready
+
+    def _is_stale(self) -> bool:
+        if self._checked_at_monotonic is None:
+            return True
+        return time.monotonic() - self._checked_at_monotonic > 3 * self.interval_seconds
+
+    @staticmethod
+    async def _select_one():
+        async with database.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def probe_once(self) -> bool:
+        """Run one SELECT 1 round trip and record the outcome"""
+        started = time.perf_counter()
+        error = None
+
+        try:
+            if database.async_engine is None:
+                database.create_async_session_factory()
+
+            await asyncio.wait_for(self._select_one(), timeout=self.timeout_seconds)
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        now = datetime.now(timezone.utc).isoformat()
+        state = dict(self._state)
+        state["last_checked_at"] = now
+
+        if error is None:
+            self._latencies_ms.append(latency_ms)
+            ordered = sorted(self._latencies_ms)
+            state.update({
+                "healthy": True,
+                "last_success_at": now,
+                "last_error": None,
+                "consecutive_failures": 0,
+                "latency_ms": {
+                    "last": round(latency_ms, 2),
+                    "p50": round(_percentile(ordered, 0.50), 2),
+                    "p95": round(_percentile(ordered, 0.95), 2),
+                    "p99": round(_percentile(ordered, 0.99), 2)
+                }
+            })
+        else:
+            if self._state["healthy"]:
+                logger.error(f"Database health probe failed: {error}")
+            state.update({
+                "healthy": False,
+                "last_error": error,
+                "consecutive_failures": self._state["consecutive_failures"] + 1
+            })
+
+        # Swap in the new state in one assignment so readers never see a partial update
+        self._state = state
+        self._checked_at_monotonic = time.monotonic()
+        if error is None and not self._ready:
+            self._ready = True
+            logger.info("Database reachable; instance is ready for traffic")
+        return error is None
+
+    async def _run(self):
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start probing in the background on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Database health prober started (every {self.interval_seconds}s)")
+
+    async def stop(self):
+        """Cancel the background probe task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @staticmethod
+    def pool_status() -> Optional[dict]:
+        """Utilization of the async engine's connection pool"""
+        if database.async_engine is None:
+            return None
+
+        pool = database.async_engine.sync_engine.pool
+        if not hasattr(pool, "checkedout"):
+            return {"pool_class": pool.__class__.__name__}
+
+        size = pool.size()
+        checked_out = pool.checkedout()
+        capacity = size + max(pool._max_overflow, 0)
+        return {
+            "pool_class": pool.__class__.__name__,
+            "size": size,
+            "checked_out": checked_out,
+            "overflow": max(pool.overflow(), 0),
+            "capacity": capacity,
+            "utilization": round(checked_out / capacity, 3) if capacity else None
+        }
+
+    def snapshot(self) -> dict:
+        """Last-known database health; O(1), never touches the database"""
+        snapshot = dict(self._state)
+        snapshot["healthy"] = self.healthy
+        snapshot["stale"] = self._is_stale()
+        snapshot["age_seconds"] = (
+            round(time.monotonic() - self._checked_at_monotonic, 3)
+            if self._checked_at_monotonic is not None else None
+        )
+        snapshot["pool"] = self.pool_status()
+        return snapshot
+
+database_health_prober = DatabaseHealthProber()
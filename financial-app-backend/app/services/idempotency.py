@@ -0,0 +1,288 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app import database
+from app.models.database_models import IdempotencyKey
+from app.responses import dumps
+from app.services.circuit_breaker import CircuitOpenError, database_circuit_breaker, is_database_failure
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a completed response is replayed, and how many keys are kept per process
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+# Share keys between workers through the idempotency_keys table (opt-in: each keyed
+# request then costs two extra write transactions, a claim and the stored response)
+IDEMPOTENCY_SHARED = os.getenv("IDEMPOTENCY_SHARED", "false").lower() == "true"
+# How long a duplicate waits for another worker's attempt before getting 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# A claim left unfinished this long (its worker died) may be taken over by a retry
+IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS = float(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", "60"))
+
+# Expired rows are deleted at most this often per worker
+_PURGE_INTERVAL_SECONDS = 600
+
+_keys = IdempotencyKey.__table__
+
+class IdempotencyKeyConflict(ValueError):
+    """The key was already used for a request with a different body"""
+
+class IdempotencyKeyInProgress(RuntimeError):
+    """Another worker is still running the first request with this key"""
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class SharedIdempotencyKeys:
+    """
+    Idempotency keys claimed in the idempotency_keys table
+
+    A key's row is read first, so replays and duplicates waiting on another
+    worker only SELECT. When there is no row, the first worker to insert one
+    runs the request and stores the response on it; the primary key makes
+    every other worker's insert fail, and those go back to reading. Claims abandoned
+    by a dead worker are taken over after IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS,
+    so a worker dying between the insert and storing the response can still
+    let a retry run twice.
+    """
+
+    def __init__(self, ttl_seconds: float, wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS,
+                 claim_timeout_seconds: float = IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self._last_purge = 0.0
+        self.unavailable_total = 0
+
+    @staticmethod
+    async def _execute(statement, commit: bool = False):
+        if database.AsyncSessionLocal is None:
+            database.create_async_session_factory()
+        async with database_circuit_breaker.guard():
+            async with database.AsyncSessionLocal() as db:
+                result = await db.execute(statement)
+                rows = result.all() if result.returns_rows else None
+                if commit:
+                    await db.commit()
+                return rows
+
+    async def _purge_expired(self):
+        if time.monotonic() - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = _utcnow() - timedelta(seconds=self.ttl_seconds)
+        await self._execute(delete(_keys).where(_keys.c.created_at < cutoff), commit=True)
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[Tuple[int, dict]]:
+        """
+        Claim `key` for this request; returns None once claimed, or the stored response
+
+        Raises IdempotencyKeyConflict for a different fingerprint and
+        IdempotencyKeyInProgress when another worker is still running it.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+
+        while True:
+            # Read first: replays and waiting duplicates never write
+            rows = await self._execute(
+                select(_keys.c.fingerprint, _keys.c.status_code, _keys.c.response, _keys.c.created_at)
+                .where(_keys.c.key == key)
+            )
+            if not rows:
+                try:
+                    await self._execute(
+                        insert(_keys).values(key=key, fingerprint=fingerprint, created_at=_utcnow()), commit=True
+                    )
+                except IntegrityError:
+                    continue  # Another worker claimed it in between; read its row
+                await self._purge_expired()
+                return None
+
+            stored_fingerprint, status_code, response, created_at = rows[0]
+            age = (_utcnow() - created_at).total_seconds()
+
+            if age > (self.ttl_seconds if status_code is not None else self.claim_timeout_seconds):
+                await self._execute(
+                    delete(_keys).where(_keys.c.key == key, _keys.c.created_at == created_at), commit=True
+                )
+                continue
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyConflict("Idempotency-Key was already used with a different request body")
+            if status_code is not None:
+                return status_code, json.loads(response)
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still being processed")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    async def complete(self, key: str, status_code: int, body: dict):
+        """Store the final response, or release the claim after a server error so a retry can run"""
+        if status_code >= 500:
+            await self._execute(delete(_keys).where(_keys.c.key == key), commit=True)
+        else:
+            await self._execute(
+                update(_keys).where(_keys.c.key == key)
+                .values(status_code=status_code, response=dumps(body).decode("utf-8")),
+                commit=True
+            )
+
+    async def release(self, key: str):
+        await self._execute(delete(_keys).where(_keys.c.key == key), commit=True)
+
+class _Entry:
+    __slots__ = ("fingerprint", "future", "created_at")
+
+    def __init__(self, fingerprint: str, future: asyncio.Future):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.created_at = time.monotonic()
+
+class IdempotencyStore:
+    """
+    Bounded, TTL-based store of responses keyed by Idempotency-Key
+
+    The first request with a key runs the operation. Concurrent duplicates
+    in this worker await that same attempt instead of racing it, and later
+    replays get the stored response without touching the database. With
+    `shared`, keys are also claimed in the database so duplicates sent to
+    other workers replay the same response. While the database is
+    unreachable, keys fall back to this worker only. Only final outcomes
+    (status < 500) are kept; server errors are forgotten so a retry can
+    run again.
+    """
+
+    def __init__(self, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS, max_keys: int = IDEMPOTENCY_MAX_KEYS,
+                 shared: bool = IDEMPOTENCY_SHARED):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self.shared = SharedIdempotencyKeys(ttl_seconds) if shared else None
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.replayed_total = 0
+        self.joined_in_flight_total = 0
+
+    def _get_live(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.future.done() and time.monotonic() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Tuple[int, dict]]]
+    ) -> Tuple[int, dict, bool]:
+        """
+        Run `operation` at most once per key; returns (status_code, body, replayed)
+
+        Raises IdempotencyKeyConflict when the key was used with another fingerprint.
+        """
+        entry = self._get_live(key)
+
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyConflict("Idempotency-Key was already used with a different request body")
+
+            if entry.future.done():
+                self.replayed_total += 1
+            else:
+                self.joined_in_flight_total += 1
+            status_code, body = await asyncio.shield(entry.future)
+            return status_code, body, True
+
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+        self._evict()
+
+        try:
+            status_code, body, replayed = await self._run_shared(key, fingerprint, operation)
+        except asyncio.CancelledError:
+            self._entries.pop(key, None)
+            entry.future.cancel()
+            raise
+        except Exception as e:
+            self._entries.pop(key, None)
+            entry.future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited isn't logged as unhandled
+            entry.future.exception()
+            raise
+
+        if status_code >= 500:
+            self._entries.pop(key, None)
+        entry.future.set_result((status_code, body))
+        if replayed:
+            self.replayed_total += 1
+        return status_code, body, replayed
+
+    async def _run_shared(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Tuple[int, dict]]]
+    ) -> Tuple[int, dict, bool]:
+        """Run `operation` under the database claim on `key`, or replay another worker's response"""
+        claimed = False
+        if self.shared is not None:
+            try:
+                stored = await self.shared.claim(key, fingerprint)
+            except (IdempotencyKeyConflict, IdempotencyKeyInProgress):
+                raise
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError) and not is_database_failure(e):
+                    raise
+                self.shared.unavailable_total += 1
+                logger.warning(f"Idempotency key not shared, database unavailable: {str(e)}")
+            else:
+                if stored is not None:
+                    return (*stored, True)
+                claimed = True
+
+        try:
+            status_code, body = await operation()
+        except BaseException:
+            if claimed:
+                await self._release_quietly(key)
+            raise
+
+        if claimed:
+            try:
+                await self.shared.complete(key, status_code, body)
+            except Exception as e:
+                logger.error(f"Could not store the response for idempotency key: {str(e)}")
+        return status_code, body, False
+
+    async def _release_quietly(self, key: str):
+        try:
+            await self.shared.release(key)
+        except Exception as e:
+            logger.error(f"Could not release idempotency key claim: {str(e)}")
+
+    def snapshot(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "max_keys": self.max_keys,
+            "ttl_seconds": self.ttl_seconds,
+            "replayed_total": self.replayed_total,
+            "joined_in_flight_total": self.joined_in_flight_total,
+            "shared": self.shared is not None,
+            "shared_unavailable_total": self.shared.unavailable_total if self.shared is not None else 0
+        }
+
+enrollment_idempotency_store = IdempotencyStore()
@@ -0,0 +1,385 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy.exc import DataError, IntegrityError
+from app import database
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Where accepted-but-unwritten enrollments are kept; mount a volume here in containers
+ENROLLMENT_OUTBOX_DIR = os.getenv("ENROLLMENT_OUTBOX_DIR", "outbox")
+# Most records a worker may hold before new enrollments are refused with 503
+ENROLLMENT_OUTBOX_MAX_RECORDS = int(os.getenv("ENROLLMENT_OUTBOX_MAX_RECORDS", "100000"))
+# Appends arriving within this window share one fsync
+ENROLLMENT_OUTBOX_FSYNC_WINDOW_MS = float(os.getenv("ENROLLMENT_OUTBOX_FSYNC_WINDOW_MS", "2"))
+# How often queued enrollments are replayed into the database, and rows per transaction
+ENROLLMENT_OUTBOX_REPLAY_INTERVAL_SECONDS = float(os.getenv("ENROLLMENT_OUTBOX_REPLAY_INTERVAL_SECONDS", "5"))
+ENROLLMENT_OUTBOX_REPLAY_BATCH_SIZE = int(os.getenv("ENROLLMENT_OUTBOX_REPLAY_BATCH_SIZE", "500"))
+
+# Positional record layout: one compact JSON array per line
+OUTBOX_FIELDS = ("outbox_ref", "plan_id", "full_name", "email", "phone", "monthly_contribution", "enrollment_date")
+
+_SEGMENT_PREFIX = "segment-"
+_DEAD_LETTER_FILE = "dead-letter.log"
+
+class OutboxFullError(RuntimeError):
+    """The outbox reached ENROLLMENT_OUTBOX_MAX_RECORDS"""
+
+def encode_record(record: dict) -> bytes:
+    """`<crc32 hex> <json array>\\n`; the checksum detects lines torn by a crash"""
+    payload = json.dumps([record[field] for field in OUTBOX_FIELDS], separators=(",", ":"))
+    data = payload.encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(data), data)
+
+def decode_line(line: bytes) -> Optional[dict]:
+    """Inverse of encode_record; None for torn or corrupt lines"""
+    try:
+        checksum, data = line.rstrip(b"\n").split(b" ", 1)
+        if int(checksum, 16) != zlib.crc32(data):
+            return None
+        return dict(zip(OUTBOX_FIELDS, json.loads(data)))
+    except ValueError:
+        return None
+
+def read_segment(fd: int) -> Tuple[List[dict], int]:
+    """All intact records of a segment and the number of corrupt lines skipped"""
+    records = []
+    corrupt = 0
+    with os.fdopen(os.dup(fd), "rb") as segment:
+        for line in segment:
+            record = decode_line(line)
+            if record is None:
+                corrupt += 1
+            else:
+                records.append(record)
+    return records, corrupt
+
+def _fsync_directory(directory: str):
+    """Persist the directory entry of a newly created or removed file"""
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+class EnrollmentOutbox:
+    """
+    Append-only, fsync-batched file of enrollments accepted while the database is down
+
+    Each worker appends to its own segment file, locked with flock while it
+    is active. An append returns only after its line is fsynced; appends
+    arriving within `fsync_window_ms` share one fsync. The replayer seals
+    the active segment, bulk inserts the records of every unlocked segment
+    (also those left behind by dead or restarted workers), skipping
+    outbox_refs already in the table, and deletes the segment once all of
+    it is committed. Rows the database rejects go to a dead-letter file.
+    """
+
+    def __init__(
+        self,
+        directory: str = ENROLLMENT_OUTBOX_DIR,
+        max_records: int = ENROLLMENT_OUTBOX_MAX_RECORDS,
+        fsync_window_ms: float = ENROLLMENT_OUTBOX_FSYNC_WINDOW_MS,
+        replay_interval_seconds: float = ENROLLMENT_OUTBOX_REPLAY_INTERVAL_SECONDS,
+        replay_batch_size: int = ENROLLMENT_OUTBOX_REPLAY_BATCH_SIZE
+    ):
+        self.directory = directory
+        self.max_records = max_records
+        self.fsync_window_ms = fsync_window_ms
+        self.replay_interval_seconds = replay_interval_seconds
+        self.replay_batch_size = replay_batch_size
+
+        self._fd: Optional[int] = None
+        self._segment_path: Optional[str] = None
+        self._segment_records = {}  # own unreplayed segment path -> outbox_refs appended to it
+        self._segment_bytes = {}  # own unreplayed segment path -> bytes appended to it
+        self._backlog_records = 0
+        self._backlog_bytes = 0
+        self._sync_waiters: List[tuple] = []  # (fd, future) appended but not yet fsynced
+        self._syncing: List[tuple] = []
+        self._sync_task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._replay_lock = asyncio.Lock()
+        self._replay_listeners: List[Callable[[List[str]], None]] = []
+
+        self.appended_total = 0
+        self.rejected_total = 0
+        self.fsyncs_total = 0
+        self.replayed_total = 0
+        self.duplicates_skipped_total = 0
+        self.dead_lettered_total = 0
+        self.corrupt_records_total = 0
+        self.last_replay_at: Optional[str] = None
+        self.last_replay_error: Optional[str] = None
+
+    @property
+    def backlog_records(self) -> int:
+        """Records this worker appended that are not yet in the database"""
+        return self._backlog_records
+
+    def add_replay_listener(self, listener: Callable[[List[str]], None]):
+        """Called with the outbox_refs of each replayed segment"""
+        self._replay_listeners.append(listener)
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{_SEGMENT_PREFIX}{time.time_ns()}-{os.getpid()}.log")
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        _fsync_directory(self.directory)
+        self._fd, self._segment_path = fd, path
+        self._segment_records[path] = []
+        self._segment_bytes[path] = 0
+
+    async def append(self, records: List[dict]):
+        """Durably append records; returns once they are fsynced"""
+        if self.backlog_records + len(records) > self.max_records:
+            self._forget_replayed_segments()
+        if self.backlog_records + len(records) > self.max_records:
+            self.rejected_total += len(records)
+            raise OutboxFullError(f"Enrollment outbox is full ({self.max_records} records)")
+
+        if self._fd is None:
+            self._open_segment()
+
+        data = b"".join(encode_record(record) for record in records)
+        os.write(self._fd, data)
+        self._segment_records[self._segment_path].extend(record["outbox_ref"] for record in records)
+        self._segment_bytes[self._segment_path] += len(data)
+        self._backlog_records += len(records)
+        self._backlog_bytes += len(data)
+        self.appended_total += len(records)
+
+        future = asyncio.get_running_loop().create_future()
+        self._sync_waiters.append((self._fd, future))
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+        await future
+
+    async def _sync_loop(self):
+        while self._sync_waiters:
+            if self.fsync_window_ms > 0:
+                await asyncio.sleep(self.fsync_window_ms / 1000)
+
+            batch, self._sync_waiters = self._sync_waiters, []
+            self._syncing = batch
+            try:
+                for fd in {fd for fd, _ in batch}:
+                    await asyncio.to_thread(os.fsync, fd)
+                self.fsyncs_total += 1
+                error = None
+            except OSError as e:
+                logger.error(f"Enrollment outbox fsync failed: {str(e)}")
+                error = e
+            finally:
+                self._syncing = []
+
+            for _, future in batch:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    async def _seal_active_segment(self):
+        """Close the active segment once its appends are fsynced; the next append opens a new one"""
+        if self._fd is None or not self._segment_records.get(self._segment_path):
+            return
+
+        old_fd = self._fd
+        self._fd = None
+        pending = [future for fd, future in self._sync_waiters + self._syncing if fd == old_fd]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Closing releases the flock, which makes the segment replayable
+        os.close(old_fd)
+
+    def _release_segment(self, path: str) -> List[str]:
+        """Drop an own segment from the backlog counters; returns its outbox_refs"""
+        refs = self._segment_records.pop(path, [])
+        self._backlog_records -= len(refs)
+        self._backlog_bytes -= self._segment_bytes.pop(path, 0)
+        return refs
+
+    def _notify_replayed(self, refs: List[str]):
+        for listener in self._replay_listeners:
+            listener(refs)
+
+    def _forget_replayed_segments(self):
+        """
+        Drop own sealed segments whose files are gone
+
+        Any worker's replayer may replay (and delete) this worker's sealed
+        segments; this worker then sees the file missing and releases the
+        records from its backlog and pending view.
+        """
+        for path in list(self._segment_records):
+            if self._fd is not None and path == self._segment_path:
+                continue
+            if not os.path.exists(path):
+                self._notify_replayed(self._release_segment(path))
+
+    def _candidate_segments(self) -> List[str]:
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name) for name in names
+            if name.startswith(_SEGMENT_PREFIX)
+            and (self._fd is None or os.path.join(self.directory, name) != self._segment_path)
+        ]
+
+    def _dead_letter(self, records: List[dict], error: Exception):
+        path = os.path.join(self.directory, _DEAD_LETTER_FILE)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, b"".join(encode_record(record) for record in records))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.dead_lettered_total += len(records)
+        logger.error(f"Moved {len(records)} outbox enrollments to {path}: {str(error)}")
+
+    @staticmethod
+    async def _insert(records: List[dict]) -> Tuple[int, int]:
+        from app.services.database_service import DatabaseService
+
+        if database.AsyncSessionLocal is None:
+            database.create_async_session_factory()
+
+        async with database.AsyncSessionLocal() as db:
+            return await db.run_sync(DatabaseService.replay_outbox_records, records)
+
+    async def _replay_records(self, records: List[dict]):
+        """Insert one chunk; rows the database rejects are isolated and dead-lettered"""
+        try:
+            inserted, duplicates = await self._insert(records)
+        except (IntegrityError, DataError) as e:
+            if len(records) == 1:
+                self._dead_letter(records, e)
+                return
+            for record in records:
+                await self._replay_records([record])
+            return
+
+        self.replayed_total += inserted
+        self.duplicates_skipped_total += duplicates
+
+    async def _replay_segment(self, path: str) -> int:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return 0
+
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0  # active segment of another worker, or being replayed elsewhere
+            if os.fstat(fd).st_nlink == 0:
+                return 0  # already replayed and removed by another worker
+
+            records, corrupt = await asyncio.to_thread(read_segment, fd)
+            self.corrupt_records_total += corrupt
+            for start in range(0, len(records), self.replay_batch_size):
+                await self._replay_records(records[start:start + self.replay_batch_size])
+
+            os.unlink(path)
+            _fsync_directory(self.directory)
+        finally:
+            os.close(fd)
+
+        self._release_segment(path)
+        self._notify_replayed([record["outbox_ref"] for record in records])
+        return len(records)
+
+    async def replay_once(self) -> int:
+        """Replay every sealed segment into the database; returns the records processed"""
+        async with self._replay_lock:
+            await self._seal_active_segment()
+            self._forget_replayed_segments()
+            replayed = 0
+            try:
+                for path in self._candidate_segments():
+                    replayed += await self._replay_segment(path)
+            except Exception as e:
+                self.last_replay_error = str(e) or e.__class__.__name__
+                logger.warning(f"Enrollment outbox replay stopped: {self.last_replay_error}")
+                raise
+
+            self.last_replay_at = datetime.now(timezone.utc).isoformat()
+            self.last_replay_error = None
+            if replayed:
+                logger.info(f"Replayed {replayed} outbox enrollments into the database")
+            return replayed
+
+    async def _run(self):
+        from app.services.health_service import database_health_prober
+
+        while True:
+            await asyncio.sleep(self.replay_interval_seconds)
+            if not database_health_prober.healthy:
+                continue
+            try:
+                await self.replay_once()
+            except Exception:
+                pass
+
+    def start(self):
+        """Start the background replayer on the running event loop"""
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop replaying, wait for outstanding fsyncs and close the active segment"""
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            try:
+                await self._replay_task
+            except asyncio.CancelledError:
+                pass
+            self._replay_task = None
+
+        if self._fd is not None:
+            empty = not self._segment_records.get(self._segment_path)
+            await self._seal_active_segment()
+            if empty:
+                os.close(self._fd)
+                self._fd = None
+                os.unlink(self._segment_path)
+                self._release_segment(self._segment_path)
+
+    def snapshot(self) -> dict:
+        """
+        Backlog depth and append/fsync/replay counters
+
+        Built from counters kept on append and replay, without touching the
+        outbox directory. The backlog covers this worker's own segments;
+        segments left by other workers are only seen by the replayer.
+        """
+        return {
+            "directory": self.directory,
+            "backlog_records": self.backlog_records,
+            "max_records": self.max_records,
+            "backlog_segments": len(self._segment_records),
+            "backlog_bytes": self._backlog_bytes,
+            "appended_total": self.appended_total,
+            "rejected_total": self.rejected_total,
+            "fsyncs_total": self.fsyncs_total,
+            "replayed_total": self.replayed_total,
+            "duplicates_skipped_total": self.duplicates_skipped_total,
+            "dead_lettered_total": self.dead_lettered_total,
+            "corrupt_records_total": self.corrupt_records_total,
+            "last_replay_at": self.last_replay_at,
+            "last_replay_error": self.last_replay_error
+        }
+
+enrollment_outbox = EnrollmentOutbox()
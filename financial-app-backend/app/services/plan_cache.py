@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+import time
+from itertools import chain
+from typing import NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.database_models import FinancialPlan, PlanBenefit
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a rendered catalog stays fresh (also sent to clients as max-age)
+PLANS_CACHE_TTL_SECONDS = int(os.getenv("PLANS_CACHE_TTL_SECONDS", "60"))
+# Static fallback responses are only cached briefly so DB recovery is picked up quickly
+PLANS_CACHE_FALLBACK_TTL_SECONDS = int(os.getenv("PLANS_CACHE_FALLBACK_TTL_SECONDS", "5"))
+
+_PLAN_CHANGE_FLAG = "plan_catalog_changed"
+
+class CachedPlans(NamedTuple):
+    """A rendered plans response together with its validators"""
+    body: bytes
+    etag: str
+    version: int
+    max_age: int
+    expires_at: float
+
+    @property
+    def cache_control(self) -> str:
+        return f"public, max-age={self.max_age}"
+
+class PlanCatalogCache:
+    """
+    Versioned in-process cache for the rendered GET /api/plans response
+
+    Invalidation is per process: only the worker that commits a plan change
+    drops its entry at once. Other workers keep serving theirs until it
+    expires, so a change can take up to `ttl_seconds` to reach every worker.
+    """
+
+    def __init__(self, ttl_seconds: int = PLANS_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._entry: Optional[CachedPlans] = None
+        self._refill_from_primary = False
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Current catalog version; bumped on every plan/benefit change"""
+        return self._version
+
+    @property
+    def refill_from_primary(self) -> bool:
+        """
+        Whether the next refill must read the primary
+
+        Set by an invalidation until a response for the new version has been
+        loaded from the primary, so lagging replica data is not cached under
+        the version of the change that was just committed.
+        """
+        return self._refill_from_primary
+
+    def get(self) -> Optional[CachedPlans]:
+        """Return the cached response if it is still current and not expired"""
+        entry = self._entry
+        if entry is None:
+            return None
+        if entry.version != self._version or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def store(self, body: bytes, version: int, ttl_seconds: Optional[int] = None,
+              from_primary: bool = False) -> CachedPlans:
+        """
+        Cache a rendered response built from catalog `version`
+
+        The version must be read *before* loading the plans, so a change that
+        commits while the response is being built leaves the entry stale.
+        `from_primary` marks a response loaded from the primary, which ends a
+        pending primary refill.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = CachedPlans(
+            body=body,
+            etag=self.compute_etag(body),
+            version=version,
+            max_age=ttl,
+            expires_at=time.monotonic() + ttl
+        )
+        with self._lock:
+            if version == self._version:
+                self._entry = entry
+                if from_primary:
+                    self._refill_from_primary = False
+        return entry
+
+    def invalidate(self):
+        """Drop the cached response and advance the catalog version"""
+        with self._lock:
+            self._version += 1
+            self._entry = None
+            self._refill_from_primary = True
+        logger.info(f"Plan catalog cache invalidated (version {self._version})")
+
+    @staticmethod
+    def compute_etag(body: bytes) -> str:
+        """Strong ETag derived from the response body, stable across workers"""
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Evaluate an If-None-Match header against `etag` (weak comparison, RFC 9110)"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in candidates:
+            return True
+        return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+plan_cache = PlanCatalogCache()
+
+# Invalidate on commit of any session that touched plans or benefits
+_CATALOG_MODELS = (FinancialPlan, PlanBenefit)
+
+@event.listens_for(Session, "after_flush")
+def _track_plan_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _CATALOG_MODELS):
+            session.info[_PLAN_CHANGE_FLAG] = True
+            return
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_plan_changes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _CATALOG_MODELS):
+        orm_execute_state.session.info[_PLAN_CHANGE_FLAG] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_PLAN_CHANGE_FLAG, False):
+        plan_cache.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_PLAN_CHANGE_FLAG, None)
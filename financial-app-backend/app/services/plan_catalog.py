@@ -0,0 +1,112 @@
+import os
+import time
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.data.financial_plans import FINANCIAL_PLANS
+from app.models.database_models import FinancialPlan
+from app.services.plan_cache import plan_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on snapshot age; plan changes committed by this worker refresh it immediately
+PLAN_CATALOG_REFRESH_SECONDS = float(os.getenv("PLAN_CATALOG_REFRESH_SECONDS", "60"))
+
+class CatalogPlan(NamedTuple):
+    """The plan fields enrollment validation and records need"""
+    id: int
+    name: str
+    interest_rate: str
+    term: str
+    min_contribution: int
+    max_contribution: int
+
+class PlanCatalogSnapshot(NamedTuple):
+    """Immutable, id-indexed view of the active plans"""
+    plans: Mapping[int, CatalogPlan]
+    version: int
+    source: str  # "database" or "static"
+    loaded_at: float
+
+    def get(self, plan_id: int) -> Optional[CatalogPlan]:
+        return self.plans.get(plan_id)
+
+def _build_snapshot(plans: Iterable, version: int, source: str) -> PlanCatalogSnapshot:
+    return PlanCatalogSnapshot(
+        plans=MappingProxyType({
+            plan.id: CatalogPlan(plan.id, plan.name, plan.interest_rate, plan.term,
+                                 plan.min_contribution, plan.max_contribution)
+            for plan in plans
+        }),
+        version=version,
+        source=source,
+        loaded_at=time.monotonic()
+    )
+
+class PlanCatalog:
+    """
+    Holder of the current plan catalog snapshot shared by every enrollment path
+
+    Readers take `latest` (or `current(db)` on the database path) and never
+    see a half-built catalog: a refresh builds a new snapshot and swaps the
+    reference. The database path refreshes when plans changed (plan_cache
+    version) or the snapshot is older than `refresh_seconds`; until the first
+    database load the static catalog is served.
+    """
+
+    def __init__(self, refresh_seconds: float = PLAN_CATALOG_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot = _build_snapshot(FINANCIAL_PLANS, version=-1, source="static")
+        self.refreshes_total = 0
+
+    @property
+    def latest(self) -> PlanCatalogSnapshot:
+        """The current snapshot, without touching the database"""
+        return self._snapshot
+
+    def is_stale(self, snapshot: PlanCatalogSnapshot) -> bool:
+        return (
+            snapshot.source != "database"
+            or snapshot.version != plan_cache.version
+            or time.monotonic() - snapshot.loaded_at >= self.refresh_seconds
+        )
+
+    def refresh(self, db: Session) -> PlanCatalogSnapshot:
+        """Load the active plans (one query) and swap in the new snapshot"""
+        # Read before loading so a change committed meanwhile leaves the snapshot stale
+        version = plan_cache.version
+        plans = db.query(
+            FinancialPlan.id,
+            FinancialPlan.name,
+            FinancialPlan.interest_rate,
+            FinancialPlan.term,
+            FinancialPlan.min_contribution,
+            FinancialPlan.max_contribution
+        ).filter(FinancialPlan.is_active == True).all()
+
+        snapshot = _build_snapshot(plans, version=version, source="database")
+        self._snapshot = snapshot
+        self.refreshes_total += 1
+        logger.info(f"Plan catalog refreshed: {len(snapshot.plans)} active plans (version {version})")
+        return snapshot
+
+    def current(self, db: Session) -> PlanCatalogSnapshot:
+        """The current snapshot, refreshed from `db` first if it is stale"""
+        snapshot = self._snapshot
+        if self.is_stale(snapshot):
+            snapshot = self.refresh(db)
+        return snapshot
+
+    def snapshot(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "source": snapshot.source,
+            "version": snapshot.version,
+            "plans": len(snapshot.plans),
+            "age_seconds": round(time.monotonic() - snapshot.loaded_at, 3),
+            "refresh_seconds": self.refresh_seconds,
+            "refreshes_total": self.refreshes_total
+        }
+
+plan_catalog = PlanCatalog()
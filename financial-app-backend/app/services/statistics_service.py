@@ -0,0 +1,380 @@
+import asyncio
+import fcntl
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import and_, delete, distinct, func, insert, select, tuple_, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import database
+from app.models.database_models import Enrollment, EnrollmentEmailCount, EnrollmentStatistic, FinancialPlan
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How often the counters are verified against a full recount (0 disables)
+ENROLLMENT_STATS_RECOUNT_SECONDS = float(os.getenv("ENROLLMENT_STATS_RECOUNT_SECONDS", "3600"))
+# Workers sharing this file elect one recounter; the others skip their runs
+ENROLLMENT_STATS_RECOUNT_LOCK_FILE = os.getenv(
+    "ENROLLMENT_STATS_RECOUNT_LOCK_FILE",
+    os.path.join(tempfile.gettempdir(), "enrollment-statistics-recount.lock")
+)
+
+_statistics = EnrollmentStatistic.__table__
+_email_counts = EnrollmentEmailCount.__table__
+
+def _increment(connection, table, key_columns: List[str], value_column: str, rows: List[dict]):
+    """Add each row's value to the stored one, inserting missing keys, in one upsert"""
+    dialect = connection.dialect.name
+
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            **{value_column: table.c[value_column] + statement.inserted[value_column]}
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={value_column: table.c[value_column] + statement.excluded[value_column]}
+        )
+    else:
+        _increment_portable(connection, table, key_columns, value_column, rows)
+        return
+
+    connection.execute(statement, rows)
+
+def _increment_portable(connection, table, key_columns: List[str], value_column: str, rows: List[dict]):
+    """
+    Read-modify-write fallback for dialects without an upsert
+
+    Locks the existing keys, adds to them and inserts the missing ones. Two
+    transactions inserting the same new key race on the primary key; the
+    loser fails with IntegrityError and its caller's error handling applies.
+    """
+    keys = [tuple(row[column] for column in key_columns) for row in rows]
+    stored = {
+        tuple(found[:-1]): found[-1]
+        for found in connection.execute(
+            select(*[table.c[column] for column in key_columns], table.c[value_column])
+            .where(tuple_(*[table.c[column] for column in key_columns]).in_(keys))
+            .with_for_update()
+        )
+    }
+
+    for key, row in zip(keys, rows):
+        if key in stored:
+            connection.execute(
+                update(table)
+                .where(and_(*[table.c[column] == value for column, value in zip(key_columns, key)]))
+                .values({value_column: stored[key] + row[value_column]})
+            )
+        else:
+            connection.execute(insert(table), row)
+
+def record_enrollment_rows(connection, rows: List[dict]):
+    """
+    Apply newly inserted enrollment rows to the running statistics
+
+    Must run in the inserting transaction so counters commit or roll back
+    with the rows. Three statements regardless of how many rows: upsert the
+    per-email counts, read them back (locked, so concurrent writers of the
+    same email serialize) to detect first and second enrollments, and
+    upsert the counters. Keys are sorted so concurrent transactions take row
+    locks in the same order.
+    """
+    if not rows:
+        return
+
+    added_by_email = Counter(row["email_normalized"] for row in rows)
+    emails = sorted(added_by_email)
+
+    _increment(connection, _email_counts, ["email"], "enrollment_count", [
+        {"email": email, "enrollment_count": added_by_email[email]} for email in emails
+    ])
+    counts_after = dict(connection.execute(
+        select(_email_counts.c.email, _email_counts.c.enrollment_count)
+        .where(_email_counts.c.email.in_(emails))
+        .with_for_update()
+    ).all())
+
+    counters = Counter({("total", ""): len(rows)})
+    counters.update(("plan", str(row["plan_id"])) for row in rows)
+    counters.update(("status", row["status"]) for row in rows)
+    for email, added in added_by_email.items():
+        after = counts_after.get(email, added)
+        before = after - added
+        if before == 0:
+            counters[("emails", "unique")] += 1
+        if before < 2 <= after:
+            counters[("emails", "multiple")] += 1
+
+    _increment(connection, _statistics, ["dimension", "name"], "value", [
+        {"dimension": dimension, "name": name, "value": value}
+        for (dimension, name), value in sorted(counters.items())
+    ])
+
+def read_enrollment_statistics(db: Session) -> dict:
+    """Statistics from the counters table; cost does not depend on the number of enrollments"""
+    counters = db.query(EnrollmentStatistic.dimension, EnrollmentStatistic.name, EnrollmentStatistic.value).all()
+    plan_names = dict(db.query(FinancialPlan.id, FinancialPlan.name).all())
+
+    values = {(dimension, name): value for dimension, name, value in counters}
+    by_plan = {}
+    by_status = {}
+    for (dimension, name), value in sorted(values.items()):
+        if dimension == "plan" and value:
+            by_plan[plan_names.get(int(name), f"Plan {name}")] = value
+        elif dimension == "status" and value:
+            by_status[name] = value
+
+    return {
+        "total_enrollments": values.get(("total", ""), 0),
+        "unique_emails": values.get(("emails", "unique"), 0),
+        "duplicate_emails": values.get(("emails", "multiple"), 0),
+        "enrollments_by_plan": by_plan,
+        "enrollments_by_status": by_status
+    }
+
+def _email_groups():
+    return select(Enrollment.email_normalized.label("email"), func.count().label("enrollment_count")) \
+        .group_by(Enrollment.email_normalized)
+
+def _enrollments_watermark(connection) -> tuple:
+    """Row count and highest id; changes whenever an insert commits"""
+    return tuple(connection.execute(select(func.count(Enrollment.id), func.max(Enrollment.id))).one())
+
+def count_enrollment_statistics(connection) -> dict:
+    """
+    Recount everything from the enrollments table without taking locks
+
+    Returns the actual counters, the per-email counts that differ from
+    enrollment_email_counts, and the enrollments watermark the counts were
+    taken at, for apply_enrollment_statistics.
+    """
+    watermark = _enrollments_watermark(connection)
+
+    actual = Counter({("total", ""): watermark[0]})
+    for plan_id, count in connection.execute(select(Enrollment.plan_id, func.count()).group_by(Enrollment.plan_id)):
+        actual[("plan", str(plan_id))] = count
+    for status, count in connection.execute(select(Enrollment.status, func.count()).group_by(Enrollment.status)):
+        actual[("status", status)] = count
+    actual[("emails", "unique")] = connection.execute(
+        select(func.count(distinct(Enrollment.email_normalized)))
+    ).scalar_one()
+    grouped = _email_groups().subquery()
+    actual[("emails", "multiple")] = connection.execute(
+        select(func.count()).select_from(grouped).where(grouped.c.enrollment_count > 1)
+    ).scalar_one()
+
+    # Per-email counts that are wrong or missing, and stored ones with no enrollments left
+    email_drift = dict(connection.execute(
+        select(grouped.c.email, grouped.c.enrollment_count)
+        .outerjoin(_email_counts, _email_counts.c.email == grouped.c.email)
+        .where((_email_counts.c.enrollment_count.is_(None)) | (_email_counts.c.enrollment_count != grouped.c.enrollment_count))
+    ).all())
+    email_drift.update((email, 0) for email in connection.execute(
+        select(_email_counts.c.email)
+        .outerjoin(grouped, grouped.c.email == _email_counts.c.email)
+        .where(grouped.c.email.is_(None))
+    ).scalars())
+
+    return {"watermark": watermark, "actual": actual, "email_drift": email_drift}
+
+def apply_enrollment_statistics(connection, counted: dict) -> Optional[dict]:
+    """
+    Rewrite the counters that differ from a count_enrollment_statistics result
+
+    Returns {"dimension:name": {"stored": x, "actual": y}} for every counter
+    that was wrong (empty when the counters were exact), or None when an
+    insert committed since the count, which makes it stale. Rows are locked
+    in the inserters' order (per-email counts, then the emails, plan, status
+    and total counters) so the transaction cannot deadlock with them, and it
+    only touches drifted rows.
+    """
+    actual = counted["actual"]
+    email_drift = counted["email_drift"]
+
+    emails = sorted(email_drift)
+    if emails:
+        connection.execute(
+            select(_email_counts.c.email).where(_email_counts.c.email.in_(emails))
+            .order_by(_email_counts.c.email).with_for_update()
+        )
+    stored = {
+        (dimension, name): value
+        for dimension, name, value in connection.execute(
+            select(_statistics.c.dimension, _statistics.c.name, _statistics.c.value)
+            .order_by(_statistics.c.dimension, _statistics.c.name)
+            .with_for_update()
+        )
+    }
+
+    # Inserts still in flight are not counted yet; they apply on top of the rewrite
+    if _enrollments_watermark(connection) != counted["watermark"]:
+        return None
+
+    drifted = sorted(
+        key for key in set(stored) | set(actual) if stored.get(key, 0) != actual.get(key, 0)
+    )
+    for dimension, name in drifted:
+        if (dimension, name) in stored:
+            connection.execute(
+                update(_statistics)
+                .where((_statistics.c.dimension == dimension) & (_statistics.c.name == name))
+                .values(value=actual.get((dimension, name), 0))
+            )
+        else:
+            connection.execute(insert(_statistics), {"dimension": dimension, "name": name, "value": actual[(dimension, name)]})
+
+    if emails:
+        connection.execute(delete(_email_counts).where(_email_counts.c.email.in_(emails)))
+        counts = [{"email": email, "enrollment_count": email_drift[email]} for email in emails if email_drift[email]]
+        if counts:
+            connection.execute(insert(_email_counts), counts)
+
+    return {
+        f"{dimension}:{name}": {"stored": stored.get((dimension, name), 0), "actual": actual.get((dimension, name), 0)}
+        for dimension, name in drifted
+    }
+
+def recount_enrollment_statistics(connection) -> dict:
+    """
+    Recount everything and rewrite drifted counters in the caller's transaction
+
+    For migrations, where nothing inserts concurrently; the background
+    recounter counts and applies in separate transactions instead.
+    """
+    return apply_enrollment_statistics(connection, count_enrollment_statistics(connection)) or {}
+
+class EnrollmentStatisticsRecounter:
+    """
+    Periodically verifies the incremental counters against a full recount and repairs drift
+
+    Only the worker holding ENROLLMENT_STATS_RECOUNT_LOCK_FILE recounts; the
+    others retry the lock each interval and take over if the leader exits.
+    """
+
+    def __init__(self, interval_seconds: float = ENROLLMENT_STATS_RECOUNT_SECONDS,
+                 lock_file: str = ENROLLMENT_STATS_RECOUNT_LOCK_FILE):
+        self.interval_seconds = interval_seconds
+        self.lock_file = lock_file
+        self._lock_fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self.runs_total = 0
+        self.stale_total = 0
+        self.drift_detected_total = 0
+        self.last_run_at: Optional[str] = None
+        self.last_drift: dict = {}
+        self.last_error: Optional[str] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def _acquire_leadership(self) -> bool:
+        """Take the recount lock if no other worker holds it"""
+        if self._lock_fd is None:
+            fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            self._lock_fd = fd
+            logger.info(f"Worker {os.getpid()} runs the enrollment statistics recount")
+        return True
+
+    def _release_leadership(self):
+        if self._lock_fd is not None:
+            # Closing releases the flock
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    @staticmethod
+    def _count(db: Session) -> dict:
+        counted = count_enrollment_statistics(db.connection())
+        db.rollback()
+        return counted
+
+    @staticmethod
+    def _apply(db: Session, counted: dict) -> Optional[dict]:
+        drift = apply_enrollment_statistics(db.connection(), counted)
+        db.commit()
+        return drift
+
+    async def recount_once(self) -> Optional[dict]:
+        """
+        Count without locks, then repair drift in a short transaction
+
+        Returns the drift, or None when inserts committed between the two
+        steps; the next run tries again.
+        """
+        if database.AsyncSessionLocal is None:
+            database.create_async_session_factory()
+
+        try:
+            async with database.AsyncSessionLocal() as db:
+                counted = await db.run_sync(self._count)
+            async with database.AsyncSessionLocal() as db:
+                drift = await db.run_sync(self._apply, counted)
+        except Exception as e:
+            self.last_error = str(e) or e.__class__.__name__
+            logger.error(f"Enrollment statistics recount failed: {self.last_error}")
+            raise
+
+        self.runs_total += 1
+        self.last_run_at = datetime.now(timezone.utc).isoformat()
+        self.last_error = None
+        if drift is None:
+            self.stale_total += 1
+            logger.info("Enrollments changed during the statistics recount; retrying next run")
+            return None
+        self.last_drift = drift
+        if drift:
+            self.drift_detected_total += 1
+            logger.warning(f"Enrollment statistics drifted and were repaired: {drift}")
+        return drift
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                if self._acquire_leadership():
+                    await self.recount_once()
+            except Exception:
+                pass
+
+    def start(self):
+        """Start periodic recounts on the running event loop"""
+        if self.interval_seconds <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background recount task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._release_leadership()
+
+    def snapshot(self) -> dict:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "leader": self.is_leader,
+            "runs_total": self.runs_total,
+            "stale_total": self.stale_total,
+            "drift_detected_total": self.drift_detected_total,
+            "last_run_at": self.last_run_at,
+            "last_drift": self.last_drift,
+            "last_error": self.last_error
+        }
+
+enrollment_statistics_recounter = EnrollmentStatisticsRecounter()
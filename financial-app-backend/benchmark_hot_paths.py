@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the per-request hot paths
+
+Times the service-layer and schema code every request runs, without HTTP:
+DatabaseService plan listing and enrollment creation (in-memory SQLite),
+EnrollmentRequest validation (including EmailStr), PlansResponse
+construction, and the EnrollmentService fallback paths. Each case is
+repeated until the timing is stable and reported as median/mean/stdev per
+call, plus the allocation peak and net retained memory per call measured
+with tracemalloc.
+
+    python benchmark_hot_paths.py                     # run and report
+    python benchmark_hot_paths.py --save-baseline     # store as the baseline
+    python benchmark_hot_paths.py -k enrollment       # only cases matching a substring
+
+With a baseline (benchmarks/hot_paths_baseline.json by default), the run
+fails (exit 1) when a case's median time or allocation peak grows by more
+than --threshold. A baseline recorded on a different machine is not
+compared; record one with --save-baseline on each machine first.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "hot_paths_baseline.json")
+
+ENROLLMENT = {
+    "name": "Bench Mark",
+    "email": "Bench.Mark@Example.com",
+    "phone": "1234567890",
+    "address": "123 Main Street, Anytown",
+    "selected_plan_id": 1,
+    "monthly_contribution": 250
+}
+
+def build_cases() -> list:
+    """[(name, callable)] for every hot path"""
+    from verify_query_counts import build_session_factory
+    from app.data.financial_plans import get_all_plans
+    from app.models.schemas import EnrollmentRequest, PlansResponse
+    from app.services.database_service import DatabaseService
+    from app.services.enrollment_service import EnrollmentService
+
+    _, SessionLocal = build_session_factory()
+    db = SessionLocal()
+    DatabaseService.seed_initial_data(db)
+    plans = DatabaseService.get_all_financial_plans(db)
+    enrollment = EnrollmentRequest.model_validate(ENROLLMENT)
+    loop = asyncio.new_event_loop()
+
+    for _ in range(20):
+        loop.run_until_complete(EnrollmentService.create_enrollment(enrollment))
+
+    def fallback_create():
+        selected_plan, _ = EnrollmentService._check_enrollment(enrollment)
+        return EnrollmentService._build_records(enrollment, selected_plan)
+
+    return [
+        ("DatabaseService.get_all_financial_plans", lambda: DatabaseService.get_all_financial_plans(db)),
+        ("DatabaseService.create_enrollment", lambda: DatabaseService.create_enrollment(db, enrollment)),
+        ("EnrollmentRequest.model_validate", lambda: EnrollmentRequest.model_validate(ENROLLMENT)),
+        ("PlansResponse (database plans)", lambda: PlansResponse(success=True, data=plans, total_plans=len(plans))),
+        ("PlansResponse (static plans)",
+         lambda: PlansResponse(success=True, data=get_all_plans(), total_plans=len(get_all_plans()))),
+        ("EnrollmentService.validate_enrollment", lambda: EnrollmentService.validate_enrollment(enrollment)),
+        ("EnrollmentService fallback records", fallback_create),
+        ("EnrollmentService.create_enrollment (outbox fsync)",
+         lambda: loop.run_until_complete(EnrollmentService.create_enrollment(enrollment))),
+        ("EnrollmentService.get_enrollments_by_email",
+         lambda: EnrollmentService.get_enrollments_by_email(ENROLLMENT["email"], 50)),
+        ("EnrollmentService.list_enrollments", lambda: EnrollmentService.list_enrollments(50)),
+        ("EnrollmentService.get_enrollment_statistics", EnrollmentService.get_enrollment_statistics),
+    ]
+
+def calibrate(func, min_time: float) -> int:
+    """Calls per sample so one sample takes at least `min_time` seconds"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time:
+            return number
+        number *= 2
+
+def measure_time(func, repeat: int, min_time: float) -> dict:
+    """Per-call wall time over `repeat` samples (microseconds), GC disabled while timing"""
+    number = calibrate(func, min_time)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - started) / number * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "calls_per_sample": number,
+        "median_us": round(statistics.median(samples), 3),
+        "mean_us": round(statistics.mean(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "min_us": round(min(samples), 3)
+    }
+
+def measure_memory(func, calls: int) -> dict:
+    """Allocation peak of one call and memory still held per call after `calls` calls"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()  # lazily created state is not charged to the steady state
+        gc.collect()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+        peak_bytes = peak - baseline
+
+        for _ in range(calls - 1):
+            func()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_bytes": peak_bytes,
+        "retained_bytes_per_call": round((retained - baseline) / calls, 1)
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Cases whose median time or allocation peak grew by more than `threshold`"""
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        if current["median_us"] > previous["median_us"] * (1 + threshold):
+            regressions.append(f"{name} median: {previous['median_us']} -> {current['median_us']} µs")
+        # Small absolute slack so a handful of bytes of interpreter noise isn't a regression
+        if current["peak_bytes"] > previous["peak_bytes"] * (1 + threshold) + 256:
+            regressions.append(f"{name} peak: {previous['peak_bytes']} -> {current['peak_bytes']} bytes")
+    return regressions
+
+def machine_description() -> str:
+    """OS, architecture, CPU model and core count; timings only compare on the same machine"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            cpu = next((line.split(":", 1)[1].strip() for line in cpuinfo if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return f"{platform.system()} {platform.machine()}, {cpu or 'unknown CPU'}, {os.cpu_count()} cores"
+
+def main():
+    """Run the microbenchmarks and compare against a baseline"""
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks")
+    parser.add_argument("-k", dest="match", help="only run cases whose name contains this substring")
+    parser.add_argument("--repeat", type=int, default=15, help="timed samples per case (default 15)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per sample (default 0.05)")
+    parser.add_argument("--memory-calls", type=int, default=200, help="calls when measuring retained memory")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"baseline JSON (default {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression as a fraction (default 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+
+    # Outbox segments written by the enrollment cases are removed when the run ends
+    with tempfile.TemporaryDirectory(prefix="securebank-bench-") as workdir:
+        os.environ["ENROLLMENT_OUTBOX_DIR"] = os.path.join(workdir, "outbox")
+        os.environ["SQL_PROFILING"] = "false"
+
+        import logging
+        logging.disable(logging.WARNING)
+
+        cases = [(name, func) for name, func in build_cases() if not args.match or args.match in name]
+
+        print(f"🔬 Hot-path microbenchmarks ({args.repeat} samples per case)")
+        print("=" * 100)
+        print(f"{'case':<52}{'median µs':>11}{'stdev µs':>10}{'min µs':>10}{'peak B':>9}{'kept B/call':>12}")
+
+        results = {"created_at": datetime.now(timezone.utc).isoformat(), "python": platform.python_version(),
+                   "machine": machine_description(), "cases": {}}
+        for name, func in cases:
+            stats = {**measure_time(func, args.repeat, args.min_time), **measure_memory(func, args.memory_calls)}
+            results["cases"][name] = stats
+            print(f"{name:<52}{stats['median_us']:>11.1f}{stats['stdev_us']:>10.1f}{stats['min_us']:>10.1f}"
+                  f"{stats['peak_bytes']:>9}{stats['retained_bytes_per_call']:>12.1f}")
+        print("=" * 100)
+
+        if args.save_baseline:
+            os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+            with open(args.baseline, "w") as baseline_file:
+                json.dump(results, baseline_file, indent=2)
+            print(f"💾 Baseline saved to {args.baseline}")
+            return
+
+        if not os.path.exists(args.baseline):
+            print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one.")
+            return
+
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("machine") != machine_description():
+            print(f"ℹ️  {args.baseline} was recorded on {baseline.get('machine', 'another machine')}; timings only "
+                  f"compare on the same machine. Run with --save-baseline here first to compare later runs.")
+            return
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ Regressions beyond {args.threshold:.0%} against {args.baseline}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"🎉 Within {args.threshold:.0%} of the baseline ({baseline['created_at']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Response serialization benchmark
+
+Times how long each endpoint's response body takes to build from service
+output, before and after the fast JSON path:
+
+    before: Pydantic response model validation (where the route declares one),
+            jsonable_encoder and the standard json encoder (JSONResponse)
+    after:  FastJSONResponse rendering the trusted service dicts directly
+
+Payloads mirror what DatabaseService returns; no database is needed.
+
+    python benchmark_serialization.py [--repeat 7] [--min-time 0.2]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+def enrollment_rows(count: int) -> list:
+    """Enrollment dicts shaped like DatabaseService._enrollment_to_dict"""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": 100000 + i,
+            "plan_id": 1 + i % 4,
+            "plan_name": "High-Yield Savings Plan",
+            "full_name": f"Benchmark User {i}",
+            "email": f"user{i}@example.com",
+            "phone": "1234567890",
+            "monthly_contribution": 250,
+            "status": "active",
+            "enrollment_date": (now - timedelta(minutes=i)).isoformat()
+        }
+        for i in range(count)
+    ]
+
+def build_cases():
+    """[(endpoint, before, after)] where each callable returns the rendered body"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.data.financial_plans import get_all_plans
+    from app.models.schemas import BatchEnrollmentResponse, EnrollmentResponse, PlansResponse
+    from app.responses import FastJSONResponse, dumps
+
+    plans = [plan.model_dump() for plan in get_all_plans()]
+    row = enrollment_rows(1)[0]
+    created = {
+        "success": True,
+        "message": "Enrollment submitted successfully! You will receive a confirmation email shortly.",
+        "enrollment_id": str(row["id"]),
+        "enrollment_data": {
+            "enrollment_id": str(row["id"]),
+            "name": row["full_name"],
+            "email": row["email"],
+            "phone": row["phone"],
+            "selected_plan": {"id": row["plan_id"], "name": row["plan_name"]},
+            "monthly_contribution": float(row["monthly_contribution"]),
+            "enrollment_date": row["enrollment_date"],
+            "status": row["status"]
+        }
+    }
+    results = [
+        {"index": i, "success": True, "enrollment_id": str(100000 + i), "message": "Enrollment created"}
+        for i in range(500)
+    ]
+    batch = {"success": True, "total": 500, "succeeded": 500, "failed": 0, "results": results}
+    page = {
+        "success": True,
+        "data": enrollment_rows(50),
+        "pagination": {"limit": 50, "next_cursor": "eyJkIjoiMjAyNS0wOC0wN1QxODowMDowMCIsImkiOjF9", "has_more": True}
+    }
+    by_email = {
+        "success": True,
+        "email": "user1@example.com",
+        "enrollment_count": 50,
+        "enrollments": enrollment_rows(50),
+        "pagination": {"limit": 50, "next_cursor": None, "has_more": False}
+    }
+    stats = {
+        "success": True,
+        "statistics": {
+            "total_enrollments": 125000,
+            "unique_emails": 98000,
+            "duplicate_emails": 12000,
+            "enrollments_by_plan": {plan["name"]: 31250 for plan in plans},
+            "enrollments_by_status": {"active": 125000}
+        }
+    }
+
+    def standard(content):
+        return JSONResponse(jsonable_encoder(content)).body
+
+    def validated(model, content):
+        return lambda: standard(model.model_validate(content))
+
+    def fast(content):
+        return lambda: FastJSONResponse(content).body
+
+    return [
+        ("GET /api/plans (cache miss)",
+         lambda: PlansResponse(success=True, data=plans, total_plans=len(plans)).model_dump_json().encode("utf-8"),
+         lambda: dumps({"success": True, "data": plans, "total_plans": len(plans)})),
+        ("POST /api/enroll", validated(EnrollmentResponse, created), fast(created)),
+        ("POST /api/enroll/batch (500 items)", validated(BatchEnrollmentResponse, batch), fast(batch)),
+        ("GET /api/enroll (50 rows)", lambda: standard(page), fast(page)),
+        ("GET /api/enroll/by-email (50 rows)", lambda: standard(by_email), fast(by_email)),
+        ("GET /api/enroll/statistics/summary", lambda: standard(stats), fast(stats)),
+    ]
+
+def time_call(func, repeat: int, min_time: float) -> float:
+    """Median microseconds per call over `repeat` runs of at least `min_time` seconds"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+    return statistics.median(samples)
+
+def main():
+    """Run the serialization benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per case (median is reported)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed run")
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+
+    from app.responses import orjson
+    print(f"⏱️  Response serialization per endpoint (encoder: {'orjson' if orjson else 'json'})")
+    print("=" * 78)
+    print(f"{'endpoint':<38}{'before µs':>12}{'after µs':>12}{'bytes':>8}{'speedup':>8}")
+
+    for name, before, after in build_cases():
+        assert before() and after(), f"{name} rendered an empty body"
+        before_us = time_call(before, args.repeat, args.min_time)
+        after_us = time_call(after, args.repeat, args.min_time)
+        print(f"{name:<38}{before_us:>12.1f}{after_us:>12.1f}{len(after()):>8}{before_us / after_us:>7.1f}x")
+
+    print("=" * 78)
+
+if __name__ == "__main__":
+    main()
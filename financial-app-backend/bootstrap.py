@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Database bootstrap for SecureBank Financial Services API
+
+Creates the database, applies schema migrations and seeds reference data.
+Run it once per deployment (e.g. as a one-off ECS task) before starting
+servers in fast-start mode:
+
+    python bootstrap.py            # create-database + migrate + seed
+    python bootstrap.py migrate    # a single step
+    python bootstrap.py status     # list pending migrations
+"""
+
+import argparse
+import os
+import sys
+
+def create_database():
+    """Create the MySQL database if it does not exist"""
+    from app.database import create_database_if_not_exists
+
+    if os.getenv("DATABASE_URL"):
+        print("⏭️  DATABASE_URL is set, skipping CREATE DATABASE")
+        return
+    create_database_if_not_exists()
+    print("✅ Database exists")
+
+def migrate():
+    """Apply pending schema migrations"""
+    from app import database
+    from app.migrations import run_migrations
+
+    if database.engine is None:
+        database.create_database_engine()
+    applied = run_migrations(database.engine)
+    print(f"✅ Applied migrations: {applied}" if applied else "✅ Schema is up to date")
+
+def seed():
+    """Seed initial financial plans"""
+    from app.database import get_database_session
+    from app.services.database_service import DatabaseService
+
+    db = next(get_database_session())
+    try:
+        DatabaseService.seed_initial_data(db)
+    finally:
+        db.close()
+    print("✅ Seed data present")
+
+def status():
+    """Print migrations that have not been applied yet"""
+    from app import database
+    from app.migrations import pending_migrations
+
+    if database.engine is None:
+        database.create_database_engine()
+    pending = pending_migrations(database.engine)
+    if not pending:
+        print("✅ No pending migrations")
+    for version, description in pending:
+        print(f"⏳ {version}: {description}")
+
+COMMANDS = {
+    "create-database": [create_database],
+    "migrate": [migrate],
+    "seed": [seed],
+    "status": [status],
+    "all": [create_database, migrate, seed],
+}
+
+def main():
+    """Run the requested bootstrap steps"""
+    parser = argparse.ArgumentParser(description="Bootstrap the SecureBank database")
+    parser.add_argument("command", nargs="?", default="all", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    print("🏦 SecureBank database bootstrap")
+    print("=" * 50)
+
+    try:
+        for step in COMMANDS[args.command]:
+            step()
+    except Exception as e:
+        print(f"❌ Bootstrap failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    # Make the app package importable when run from elsewhere
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+In-process load test for the API
+
+Boots main:app (startup and shutdown included) against a throwaway SQLite
+database and drives a weighted mix of GET /api/plans/, POST /api/enroll/ and
+GET /api/enroll/{id} through httpx's ASGI transport at a fixed concurrency.
+Reports throughput and p50/p95/p99 latency per endpoint. Client and server
+share one event loop, so the numbers measure the application stack (routing,
+validation, database service, serialization), not the network.
+
+    python load_test.py                                    # run and report
+    python load_test.py --save-baseline                    # store as the baseline
+    python load_test.py --baseline benchmarks/load_test_baseline.json --threshold 0.25
+
+With a baseline, the run fails (exit 1) when an endpoint's p95 or p99
+latency rises, or its throughput falls, by more than the threshold. A
+baseline recorded on a different machine is not compared; record one with
+--save-baseline on each machine that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "load_test_baseline.json")
+DEFAULT_MIX = "plans=5,get_enrollment=3,create_enrollment=2"
+
+ENROLLMENT = {
+    "name": "Load Test",
+    "email": "load.test@example.com",
+    "phone": "1234567890",
+    "address": "123 Main Street, Anytown",
+    "selected_plan_id": 1,
+    "monthly_contribution": 250
+}
+
+def parse_mix(mix: str) -> dict:
+    """'plans=5,get_enrollment=3' -> {'plans': 5.0, 'get_enrollment': 3.0}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("plans", "get_enrollment", "create_enrollment"):
+            raise argparse.ArgumentTypeError(f"unknown endpoint in mix: {name.strip()}")
+        weights[name.strip()] = float(weight)
+    return weights
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+class LoadTest:
+    """Runs the traffic mix and collects per-endpoint latencies and status codes"""
+
+    def __init__(self, client, weights: dict, concurrency: int, total_requests: int, seed: int):
+        self.client = client
+        self.weights = weights
+        self.concurrency = concurrency
+        self.total_requests = total_requests
+        self.random = random.Random(seed)
+        self.enrollment_ids = []
+        self.latencies = {name: [] for name in weights}
+        self.statuses = {name: Counter() for name in weights}
+        self._issued = 0
+
+    async def plans(self):
+        return await self.client.get("/api/plans/")
+
+    async def create_enrollment(self):
+        response = await self.client.post("/api/enroll/", json=ENROLLMENT)
+        if response.status_code == 201:
+            self.enrollment_ids.append(response.json()["enrollment_id"])
+        return response
+
+    async def get_enrollment(self):
+        return await self.client.get(f"/api/enroll/{self.random.choice(self.enrollment_ids)}")
+
+    async def seed(self, count: int):
+        """Create enrollments up front so reads have ids to fetch"""
+        for _ in range(count):
+            await self.create_enrollment()
+        if not self.enrollment_ids:
+            raise RuntimeError("seeding enrollments failed; is the database reachable?")
+
+    async def _worker(self, names: list, weights: list):
+        while self._issued < self.total_requests:
+            self._issued += 1
+            name = self.random.choices(names, weights)[0]
+            started = time.perf_counter()
+            response = await getattr(self, name)()
+            self.latencies[name].append((time.perf_counter() - started) * 1000)
+            self.statuses[name][response.status_code] += 1
+
+    async def run(self) -> float:
+        """Issue total_requests requests from `concurrency` workers; returns wall seconds"""
+        names = list(self.weights)
+        weights = [self.weights[name] for name in names]
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker(names, weights) for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, latencies in self.latencies.items():
+            latencies.sort()
+            requests = len(latencies)
+            errors = sum(count for status, count in self.statuses[name].items() if status >= 400)
+            endpoints[name] = {
+                "requests": requests,
+                "errors": errors,
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+                "rps": round(requests / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 0.50), 3),
+                "p95_ms": round(percentile(latencies, 0.95), 3),
+                "p99_ms": round(percentile(latencies, 0.99), 3),
+                "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+                "statuses": {str(status): count for status, count in sorted(self.statuses[name].items())}
+            }
+        return endpoints
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Regressions of more than `threshold` (fraction) against the baseline"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or not current["requests"]:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {previous[metric]} -> {current[metric]}")
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name} rps: {previous['rps']} -> {current['rps']}")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{name} error_rate: {previous['error_rate']} -> {current['error_rate']}")
+    return regressions
+
+async def run_load_test(args) -> dict:
+    import httpx
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            load_test = LoadTest(client, args.mix, args.concurrency, args.requests, args.seed)
+            await load_test.seed(args.seed_enrollments)
+
+            # Warm caches, the plan catalog and the connection pool before measuring
+            warmup = LoadTest(client, args.mix, args.concurrency, args.warmup, args.seed + 1)
+            warmup.enrollment_ids = load_test.enrollment_ids
+            await warmup.run()
+
+            elapsed = await load_test.run()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": machine_description(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "seed": args.seed
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "total_rps": round(args.requests / elapsed, 1),
+        "endpoints": load_test.report(elapsed)
+    }
+
+def machine_description() -> str:
+    """OS, architecture, CPU model and core count; timings only compare on the same machine"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            cpu = next((line.split(":", 1)[1].strip() for line in cpuinfo if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return f"{platform.system()} {platform.machine()}, {cpu or 'unknown CPU'}, {os.cpu_count()} cores"
+
+def main():
+    """Run the load test and compare against a baseline"""
+    parser = argparse.ArgumentParser(description="In-process API load test")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests (default 2000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients (default 16)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured warm-up requests (default 200)")
+    parser.add_argument("--seed-enrollments", type=int, default=50, help="enrollments created before the run")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request mix")
+    parser.add_argument("--database-url", help="database to run against (default: a fresh temporary SQLite file)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"baseline JSON (default {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed regression as a fraction (default 0.20)")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+
+    workdir = tempfile.mkdtemp(prefix="securebank-loadtest-")
+    try:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+        os.environ.setdefault("ENROLLMENT_OUTBOX_DIR", os.path.join(workdir, "outbox"))
+
+        import logging
+        logging.disable(logging.WARNING)
+
+        print(f"🚦 Load test: {args.requests} requests, concurrency {args.concurrency}, mix {args.mix}")
+        results = asyncio.run(run_load_test(args))
+
+        print("=" * 78)
+        print(f"{'endpoint':<20}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for name, stats in results["endpoints"].items():
+            print(f"{name:<20}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>9}"
+                  f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['max_ms']:>9}")
+        print(f"{'total':<20}{args.requests:>9}{'':>8}{results['total_rps']:>9}")
+        print("=" * 78)
+
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(results, output, indent=2)
+
+        if args.save_baseline:
+            os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+            with open(args.baseline, "w") as baseline_file:
+                json.dump(results, baseline_file, indent=2)
+            print(f"💾 Baseline saved to {args.baseline}")
+            return
+
+        if not os.path.exists(args.baseline):
+            print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one.")
+            return
+
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("machine") != machine_description():
+            print(f"ℹ️  {args.baseline} was recorded on {baseline.get('machine', 'another machine')}; timings only "
+                  f"compare on the same machine. Run with --save-baseline here first to compare later runs.")
+            return
+        if baseline.get("config") != results["config"]:
+            print(f"❌ {args.baseline} was recorded with {baseline.get('config')}; "
+                  f"rerun with the same settings or --save-baseline.")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ Regressions beyond {args.threshold:.0%} against {args.baseline}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"🎉 Within {args.threshold:.0%} of the baseline ({baseline['created_at']}).")
+    finally:
+        # The SQLite database and outbox segments are only needed for this run
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
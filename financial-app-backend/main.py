@@ -1,26 +1,50 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.routers import plans, enrollment
-from app.database import init_database, create_tables, check_database_health
+from app.database import init_database, create_tables, create_async_session_factory, dispose_async_engine, replica_set
 from app.services.database_service import DatabaseService
+from app.services.health_service import database_health_prober
+from app.services.group_commit import enrollment_group_committer
+from app.services.idempotency import enrollment_idempotency_store
+from app.services.statistics_service import enrollment_statistics_recounter
+from app.services.outbox import enrollment_outbox
+from app.services.circuit_breaker import database_circuit_breaker
+from app.services.plan_catalog import plan_catalog
+from app.responses import FastJSONResponse
+from app.middleware.admission import AdmissionControlMiddleware, admission_snapshot
+from app.middleware.metrics import RequestMetricsMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.profiling import SQL_PROFILING
+from app.metrics import render_metrics
+from datetime import datetime, timezone
 from app.database import get_database_session
 import uvicorn
 import logging
+import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fast-start mode only opens the connection pool; schema and seed data are
+# handled by `python bootstrap.py` (run once per deployment)
+FAST_START = os.getenv("FAST_START", "false").lower() == "true"
+
 # Create FastAPI application
 app = FastAPI(
     title="SecureBank Financial Services API",
     description="Backend API for financial/banking web application",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson-rendered responses; hot routes return them directly to skip re-validation
+    default_response_class=FastJSONResponse
 )
 
+# Bound per-route concurrency and shed excess load with 503 (inside CORS so rejections keep CORS headers)
+app.add_middleware(AdmissionControlMiddleware)
+
 # Configure CORS for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -30,10 +54,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL query count and time, reported in a Server-Timing header
+if SQL_PROFILING:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Outermost, so per-route counts and latency include shed requests and CORS preflights
+app.add_middleware(RequestMetricsMiddleware)
+
 # Database initialization
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
+    if FAST_START:
+        logger.info("Fast start: skipping schema creation and seeding (run bootstrap.py)")
+        try:
+            create_async_session_factory()
+        except Exception as e:
+            logger.error(f"Database engine setup failed: {str(e)}")
+        
+        # Readiness flips once the prober's first check succeeds
+        database_health_prober.start()
+        enrollment_statistics_recounter.start()
+        enrollment_outbox.start()
+        return
+    
     try:
         logger.info("Initializing database connection...")
         init_database()
@@ -55,6 +99,22 @@ async def startup_event():
         logger.error(f"Database initialization failed: {str(e)}")
         # Don't fail startup - allow app to run with fallback data
         logger.warning("Application will continue with fallback data")
+    
+    # Probe database health in the background; health endpoints read the snapshot
+    database_health_prober.start()
+    # Verify the incremental enrollment statistics against a full recount periodically
+    enrollment_statistics_recounter.start()
+    # Replay enrollments accepted during database outages (also other workers' leftovers)
+    enrollment_outbox.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and release pooled async database connections"""
+    await database_health_prober.stop()
+    await enrollment_statistics_recounter.stop()
+    await enrollment_outbox.stop()
+    await enrollment_group_committer.drain()
+    await dispose_async_engine()
 
 # Include routers
 app.include_router(plans.router, prefix="/api")
@@ -68,7 +128,7 @@ async def root():
         "message": "SecureBank Financial Services API",
         "version": "1.0.0",
         "status": "active",
-        "database_connected": check_database_health(),
+        "database_connected": database_health_prober.healthy,
         "endpoints": {
             "plans": "/api/plans",
             "enrollment": "/api/enroll",
@@ -80,16 +140,47 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    db_healthy = check_database_health()
+    """Health check endpoint (served from the background prober's last-known state)"""
+    db_health = database_health_prober.snapshot()
+    db_healthy = db_health["healthy"]
     
     return {
         "status": "healthy" if db_healthy else "degraded",
         "service": "SecureBank Financial API",
         "database": "connected" if db_healthy else "disconnected",
-        "timestamp": "2025-08-07T18:00:00Z"
+        "database_health": db_health,
+        "circuit_breaker": database_circuit_breaker.snapshot(),
+        "admission": admission_snapshot(),
+        "group_commit": enrollment_group_committer.snapshot(),
+        "idempotency": enrollment_idempotency_store.snapshot(),
+        "statistics_recount": enrollment_statistics_recounter.snapshot(),
+        "outbox": enrollment_outbox.snapshot(),
+        "plan_catalog": plan_catalog.snapshot(),
+        "read_replicas": replica_set.snapshot(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus exposition of route, connection pool and fallback metrics (all workers)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the first successful database check"""
+    ready = database_health_prober.ready
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "database": "connected" if database_health_prober.healthy else "disconnected"
+        }
+    )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
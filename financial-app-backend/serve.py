@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Production server for SecureBank Financial Services API
+
+Pre-forks one uvicorn worker per available core under gunicorn, capped at
+what the connection budget can serve. Every worker builds its own database
+engines after the fork, with the pool sized from a global connection budget
+so N workers never exceed what MySQL allows; an explicit worker count the
+budget can't serve is refused. Workers are recycled gracefully after a configurable number of
+requests.
+
+Environment:
+    WEB_CONCURRENCY        worker count (default: available cores)
+    DB_CONNECTION_BUDGET   total connections across all workers (default 30)
+    DB_BACKGROUND_CONNECTIONS  connections per worker kept free for background sessions (default 3)
+    MAX_REQUESTS           requests before a worker is recycled (default 10000, 0 disables)
+    MAX_REQUESTS_JITTER    random jitter so workers don't recycle together (default 10%)
+    GRACEFUL_TIMEOUT       seconds a recycled worker gets to finish requests (default 30)
+    PORT                   listen port (default 8000)
+    PROMETHEUS_MULTIPROC_DIR  shared directory for per-worker metric files (default: <tmp>/securebank-metrics,
+                           emptied on start)
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import logging
+
+from gunicorn.app.base import BaseApplication
+
+logger = logging.getLogger(__name__)
+
+def available_cores() -> int:
+    """CPU cores this process may use, honouring affinity and cgroup v2 quotas (ECS)"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cores)
+
+# Fewest connections a worker's requests get on top of its background reserve
+MIN_REQUEST_CONNECTIONS = 2
+
+def connections_per_worker(background: int) -> int:
+    """Smallest pool a worker can run with: request connections plus the background reserve"""
+    return MIN_REQUEST_CONNECTIONS + background
+
+def max_workers(budget: int, background: int) -> int:
+    """Most workers whose pools fit in the connection budget"""
+    return budget // connections_per_worker(background)
+
+def pool_settings(workers: int, budget: int, background: int) -> tuple:
+    """
+    Split the connection budget into (pool_size, max_overflow) per worker, keeping the 1:2 ratio
+
+    The health prober, outbox replayer and statistics recounter draw from the
+    same per-worker pool, so every pool must hold `background` connections
+    beyond the requests' minimum. Raises ValueError when the budget can't.
+    """
+    per_worker = budget // workers
+    if per_worker < connections_per_worker(background):
+        raise ValueError(
+            f"DB_CONNECTION_BUDGET={budget} can't give {workers} workers "
+            f"{connections_per_worker(background)} connections each "
+            f"({MIN_REQUEST_CONNECTIONS} for requests + {background} background); "
+            f"use at most {max_workers(budget, background)} workers or raise the budget"
+        )
+    pool_size = max(1, per_worker // 3)
+    return pool_size, per_worker - pool_size
+
+def post_fork(server, worker):
+    """Runs in each worker right after fork"""
+    from app.database import reset_engines_after_fork
+
+    reset_engines_after_fork()
+
+def child_exit(server, worker):
+    """Runs in the master when a worker exits"""
+    from prometheus_client import multiprocess
+
+    # Drop the dead worker's live gauges (pool connections) from /metrics
+    multiprocess.mark_process_dead(worker.pid)
+
+def prepare_metrics_dir() -> str:
+    """
+    Empty directory where every worker writes its prometheus_client metric files
+
+    Must be set before the app is imported so /metrics, served by any worker,
+    sums all of them.
+    """
+    path = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "securebank-metrics")
+    )
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    return path
+
+class ProductionServer(BaseApplication):
+    """Embedded gunicorn application serving main:app with uvicorn workers"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+
+        return app
+
+def bootstrap_before_fork():
+    """
+    Apply migrations and seed once in the master, then drop its engine before forking
+
+    A failure is logged and the server starts anyway, serving fallback data
+    until the database is reachable, instead of crash-looping the container.
+    """
+    from app.database import create_tables, get_database_session, reset_engines_after_fork
+    from app.services.database_service import DatabaseService
+
+    try:
+        create_tables()
+        db = next(get_database_session())
+        try:
+            DatabaseService.seed_initial_data(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Bootstrap failed, starting without it (run bootstrap.py once the database is up): {str(e)}")
+    finally:
+        reset_engines_after_fork()
+
+def main():
+    """Start the pre-forking production server"""
+    parser = argparse.ArgumentParser(description="Run the SecureBank API with multiple workers")
+    parser.add_argument("--bootstrap", action="store_true",
+                        help="run migrations and seeding once in the master before forking "
+                             "(single-task deployments; otherwise run bootstrap.py as a one-off step)")
+    args = parser.parse_args()
+
+    budget = int(os.getenv("DB_CONNECTION_BUDGET", "30"))
+    background = int(os.getenv("DB_BACKGROUND_CONNECTIONS", "3"))
+    if os.getenv("WEB_CONCURRENCY"):
+        workers = int(os.getenv("WEB_CONCURRENCY"))
+    else:
+        # One per core, but never more than the connection budget can serve
+        workers = max(1, min(available_cores(), max_workers(budget, background)))
+    try:
+        pool_size, max_overflow = pool_settings(workers, budget, background)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+
+    # Workers inherit these; each one builds its own pool of this size after fork, and
+    # admission control derives its per-worker concurrency limits from it (set before import)
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    os.environ["DB_BACKGROUND_CONNECTIONS"] = str(background)
+    # Schema and seed data are handled once (bootstrap.py or --bootstrap), never per worker
+    os.environ["FAST_START"] = "true"
+    prepare_metrics_dir()
+
+    if args.bootstrap:
+        bootstrap_before_fork()
+
+    print(f"🏦 Starting SecureBank API: {workers} workers, "
+          f"{pool_size}+{max_overflow} connections each, {background} kept for background work (budget {budget})")
+
+    ProductionServer({
+        "bind": f"0.0.0.0:{os.getenv('PORT', '8000')}",
+        "workers": workers,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "max_requests": max_requests,
+        "max_requests_jitter": int(os.getenv("MAX_REQUESTS_JITTER", max_requests // 10)),
+        "graceful_timeout": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        "accesslog": "-",
+    }).run()
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -8,7 +8,9 @@ import sys
 import os
 
 def main():
-    """Start the FastAPI server"""
+    """Start the FastAPI server (development; use serve.py in production)"""
+    reload = os.getenv("RELOAD", "true").lower() == "true"
+    
     print("🏦 Starting SecureBank Financial Services API...")
     print("=" * 50)
     
@@ -17,7 +19,7 @@ def main():
             "main:app",
             host="0.0.0.0",
             port=8000,
-            reload=True,
+            reload=reload,
             log_level="info",
             access_log=True
         )
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Query-count guard for the database service layer
+
+Runs every DatabaseService call against an in-memory SQLite database, counts
+the SQL statements each one issues and fails when a call exceeds its budget.
+The bulk enrollment insert is also compiled for MySQL, which takes the
+no-RETURNING path.
+Run this after touching app/services/database_service.py:
+
+    python verify_query_counts.py
+"""
+
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Maximum SQL round trips allowed per service call
+QUERY_BUDGETS = {
+    "seed_initial_data (already seeded)": 1,
+    "get_all_financial_plans": 2,
+    "search_financial_plans": 2,
+    # Paid once per plan change or refresh interval, not per enrollment
+    "plan_catalog.refresh": 1,
+    # INSERT, then 3 statements maintaining the statistics counters (plan checked in memory)
+    "create_enrollment": 4,
+    "create_enrollments_batch (50 items)": 4,
+    "get_enrollment_by_id": 1,
+    "get_enrollment_by_id (missing)": 1,
+    "list_enrollments (first page)": 1,
+    "list_enrollments (next page)": 1,
+    "get_enrollment_statistics": 2,
+    "get_enrollments_by_email": 2,
+    "replay_outbox_records (50 records)": 5,
+    # No RETURNING on MySQL: still one multi-row INSERT, plus the 3 statistics statements
+    "insert_enrollment_rows (MySQL dialect, 500 rows)": 4,
+}
+
+class QueryCounter:
+    """Collects the statements executed on an engine"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_queries(engine):
+    """Count every cursor execution (executemany counts once) inside the block"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+class MySQLStatementRecorder:
+    """
+    Stand-in session and connection that compiles statements for MySQL (pymysql) and records them
+
+    No MySQL server is needed: results are empty and lastrowid is fixed,
+    which is enough to count round trips on the dialect without RETURNING.
+    """
+
+    FIRST_ID = 1000
+
+    def __init__(self):
+        from sqlalchemy.dialects.mysql.pymysql import MySQLDialect_pymysql
+
+        self.dialect = MySQLDialect_pymysql()
+        self.statements = []
+
+    def connection(self):
+        return self
+
+    def execute(self, statement, parameters=None):
+        self.statements.append(str(statement.compile(dialect=self.dialect)))
+        return SimpleNamespace(lastrowid=self.FIRST_ID, all=lambda: [])
+
+def check_mysql_insert(results: dict):
+    """Bulk enrollment insert on the MySQL dialect, which has no INSERT ... RETURNING"""
+    from app.models.schemas import EnrollmentRequest
+    from app.services.database_service import _build_enrollment_row, insert_enrollment_rows
+
+    enrollment_data = EnrollmentRequest(
+        name="Query Counter",
+        email="query.counter@example.com",
+        phone="1234567890",
+        address="123 Main Street, Anytown",
+        selected_plan_id=1,
+        monthly_contribution=100
+    )
+    now = datetime.now(timezone.utc)
+    rows = [_build_enrollment_row(enrollment_data, now) for _ in range(500)]
+
+    recorder = MySQLStatementRecorder()
+    ids = insert_enrollment_rows(recorder, rows)
+    results["insert_enrollment_rows (MySQL dialect, 500 rows)"] = recorder.statements
+    first_id = MySQLStatementRecorder.FIRST_ID
+    assert ids == list(range(first_id, first_id + 500)), "MySQL ids are not mapped back to the rows"
+
+def build_session_factory():
+    """Create an in-memory database with the application schema"""
+    from app.database import Base
+    from app.models import database_models  # noqa: F401 - registers models
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def run_checks(engine, SessionLocal):
+    """Execute each service call once and return {name: statements}"""
+    from app.models.schemas import EnrollmentRequest
+    from app.services.database_service import DatabaseService
+    from app.services.plan_catalog import plan_catalog
+
+    results = {}
+    db = SessionLocal()
+    try:
+        DatabaseService.seed_initial_data(db)
+
+        with count_queries(engine) as counter:
+            DatabaseService.seed_initial_data(db)
+        results["seed_initial_data (already seeded)"] = counter.statements
+
+        with count_queries(engine) as counter:
+            plans = DatabaseService.get_all_financial_plans(db)
+        results["get_all_financial_plans"] = counter.statements
+        assert all(plan["benefits"] for plan in plans), "plans lost their benefits"
+
+        with count_queries(engine) as counter:
+            page = DatabaseService.search_financial_plans(
+                db, contribution=plans[0]["min_contribution"], min_rate_bps=0, sort="-interest_rate"
+            )
+        results["search_financial_plans"] = counter.statements
+        assert page["items"] and all(plan["benefits"] for plan in page["items"]), "search lost plans or benefits"
+
+        with count_queries(engine) as counter:
+            plan_catalog.refresh(db)
+        results["plan_catalog.refresh"] = counter.statements
+
+        enrollment_data = EnrollmentRequest(
+            name="Query Counter",
+            email="query.counter@example.com",
+            phone="1234567890",
+            address="123 Main Street, Anytown",
+            selected_plan_id=plans[0]["id"],
+            monthly_contribution=plans[0]["min_contribution"]
+        )
+        with count_queries(engine) as counter:
+            enrollment = DatabaseService.create_enrollment(db, enrollment_data)
+        results["create_enrollment"] = counter.statements
+
+        batch = [enrollment_data.model_dump() for _ in range(50)]
+        with count_queries(engine) as counter:
+            batch_results = DatabaseService.create_enrollments_batch(db, batch)
+        results["create_enrollments_batch (50 items)"] = counter.statements
+        assert all(result["success"] for result in batch_results), "batch items failed"
+
+        # Use a fresh session so nothing is served from the identity map
+        db.close()
+        db = SessionLocal()
+
+        with count_queries(engine) as counter:
+            fetched = DatabaseService.get_enrollment_by_id(db, enrollment["id"])
+        results["get_enrollment_by_id"] = counter.statements
+        assert fetched["plan_name"] == plans[0]["name"], "enrollment lost its plan name"
+
+        with count_queries(engine) as counter:
+            DatabaseService.get_enrollment_by_id(db, enrollment["id"] + 1000)
+        results["get_enrollment_by_id (missing)"] = counter.statements
+
+        with count_queries(engine) as counter:
+            page = DatabaseService.list_enrollments(db, limit=20)
+        results["list_enrollments (first page)"] = counter.statements
+        assert page["has_more"] and len(page["items"]) == 20, "first page is incomplete"
+
+        with count_queries(engine) as counter:
+            next_page = DatabaseService.list_enrollments(db, limit=20, cursor=page["next_cursor"])
+        results["list_enrollments (next page)"] = counter.statements
+        first_ids = {item["id"] for item in page["items"]}
+        assert not first_ids & {item["id"] for item in next_page["items"]}, "pages overlap"
+
+        with count_queries(engine) as counter:
+            statistics = DatabaseService.get_enrollment_statistics(db)
+        results["get_enrollment_statistics"] = counter.statements
+        assert statistics["total_enrollments"] == 51, "statistics counters missed inserts"
+        assert statistics["duplicate_emails"] == 1, "multiple-enrollment email not counted"
+
+        with count_queries(engine) as counter:
+            by_email = DatabaseService.get_enrollments_by_email(db, "Query.Counter@Example.com", limit=10)
+        results["get_enrollments_by_email"] = counter.statements
+        assert by_email["total"] == 51 and len(by_email["items"]) == 10, "email lookup is not case-insensitive"
+
+        records = [{
+            "outbox_ref": f"query-counter-{index}",
+            "plan_id": plans[0]["id"],
+            "full_name": "Query Counter",
+            "email": "outbox@example.com",
+            "phone": "1234567890",
+            "monthly_contribution": plans[0]["min_contribution"],
+            "enrollment_date": "2025-01-01T00:00:00+00:00"
+        } for index in range(50)]
+        with count_queries(engine) as counter:
+            inserted, _ = DatabaseService.replay_outbox_records(db, records)
+        results["replay_outbox_records (50 records)"] = counter.statements
+        assert inserted == 50, "outbox records were not inserted"
+        assert DatabaseService.replay_outbox_records(db, records) == (0, 50), "outbox replay is not deduplicated"
+    finally:
+        db.close()
+
+    return results
+
+def main():
+    """Run the query-count guard"""
+    print("🔍 Checking DatabaseService query counts...")
+    print("=" * 60)
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+
+    engine, SessionLocal = build_session_factory()
+    results = run_checks(engine, SessionLocal)
+    check_mysql_insert(results)
+
+    all_passed = True
+    for name, budget in QUERY_BUDGETS.items():
+        statements = results[name]
+        if len(statements) <= budget:
+            print(f"✅ {name}: {len(statements)} queries (budget {budget})")
+        else:
+            all_passed = False
+            print(f"❌ {name}: {len(statements)} queries (budget {budget})")
+            for statement in statements:
+                print(f"   - {' '.join(statement.split())}")
+
+    print("=" * 60)
+    if not all_passed:
+        print("❌ Query budget exceeded. Remove the extra round trips or update QUERY_BUDGETS deliberately.")
+        sys.exit(1)
+    print("🎉 All service calls are within their query budgets.")
+
+if __name__ == "__main__":
+    main()
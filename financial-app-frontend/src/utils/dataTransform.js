@@ -4,7 +4,9 @@ export const transformPlanFromBackend = (backendPlan) => {
     id: backendPlan.id,
     name: backendPlan.name,
     interestRate: backendPlan.interest_rate,
+    interestRateBps: backendPlan.interest_rate_bps,
     term: backendPlan.term,
+    termMonths: backendPlan.term_months,
     minContribution: backendPlan.min_contribution,
     maxContribution: backendPlan.max_contribution,
     benefits: backendPlan.benefits,